@@ -0,0 +1,71 @@
+"""镜头数值规格字段
+
+Revision ID: 3c8e1f0b7a92
+Revises: 5716cb90aacb
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from utils.lens_specs import lens_spec_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e1f0b7a92'
+down_revision: Union[str, None] = '5716cb90aacb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('lens', sa.Column('focal_min_mm', sa.Float(), nullable=True))
+    op.add_column('lens', sa.Column('focal_max_mm', sa.Float(), nullable=True))
+    op.add_column('lens', sa.Column('aperture_min', sa.Float(), nullable=True))
+    op.add_column('lens', sa.Column('aperture_max', sa.Float(), nullable=True))
+    op.create_index('ix_lens_focal_range', 'lens', ['focal_min_mm', 'focal_max_mm'], unique=False)
+    op.create_index('ix_lens_aperture_min', 'lens', ['aperture_min'], unique=False)
+
+    # 回填：解析已有镜头的焦距、光圈文本，一条executemany写回
+    lens = sa.table(
+        'lens',
+        sa.column('id', sa.Integer),
+        sa.column('focal_length', sa.String),
+        sa.column('aperture_range', sa.String),
+        sa.column('focal_min_mm', sa.Float),
+        sa.column('focal_max_mm', sa.Float),
+        sa.column('aperture_min', sa.Float),
+        sa.column('aperture_max', sa.Float),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(lens.c.id, lens.c.focal_length, lens.c.aperture_range)).all()
+    params = [
+        {"lens_id": lens_id, **lens_spec_columns(focal_length, aperture_range)}
+        for lens_id, focal_length, aperture_range in rows
+    ]
+    if params:
+        bind.execute(
+            lens.update()
+            .where(lens.c.id == sa.bindparam('lens_id'))
+            .values(
+                focal_min_mm=sa.bindparam('focal_min_mm'),
+                focal_max_mm=sa.bindparam('focal_max_mm'),
+                aperture_min=sa.bindparam('aperture_min'),
+                aperture_max=sa.bindparam('aperture_max'),
+            ),
+            params,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lens_aperture_min', table_name='lens')
+    op.drop_index('ix_lens_focal_range', table_name='lens')
+    op.drop_column('lens', 'aperture_max')
+    op.drop_column('lens', 'aperture_min')
+    op.drop_column('lens', 'focal_max_mm')
+    op.drop_column('lens', 'focal_min_mm')
@@ -0,0 +1,31 @@
+"""文章评论数索引
+
+Revision ID: 5716cb90aacb
+Revises: ab90f3604dd7
+Create Date: 2026-10-18 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5716cb90aacb'
+down_revision: Union[str, None] = 'ab90f3604dd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 支持按评论数排序的"最多讨论"列表
+    op.create_index('ix_article_comment_count_id', 'article', ['comment_count', 'id'], unique=False)
+    # 已有数据请执行 python -m scripts.reconcile_comment_counts 校正评论数
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_article_comment_count_id', table_name='article')
@@ -0,0 +1,55 @@
+"""规范化型号代码
+
+Revision ID: 9d2b4e6f1c37
+Revises: 3c8e1f0b7a92
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from utils.model_codes import normalize_model_code
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2b4e6f1c37'
+down_revision: Union[str, None] = '3c8e1f0b7a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('camera', sa.Column('model_code_key', sa.String(length=50), nullable=True))
+    op.create_index(op.f('ix_camera_model_code_key'), 'camera', ['model_code_key'], unique=False)
+
+    # 回填：按当前别名表规范化已有相机的型号代码，一条executemany写回
+    camera = sa.table(
+        'camera',
+        sa.column('id', sa.Integer),
+        sa.column('model_code', sa.String),
+        sa.column('model_code_key', sa.String),
+    )
+    bind = op.get_bind()
+    params = [
+        {"camera_id": camera_id, "model_code_key": normalize_model_code(model_code)}
+        for camera_id, model_code in bind.execute(
+            sa.select(camera.c.id, camera.c.model_code).where(camera.c.model_code.is_not(None))
+        ).all()
+    ]
+    if params:
+        bind.execute(
+            camera.update()
+            .where(camera.c.id == sa.bindparam('camera_id'))
+            .values(model_code_key=sa.bindparam('model_code_key')),
+            params,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_camera_model_code_key'), table_name='camera')
+    op.drop_column('camera', 'model_code_key')
@@ -0,0 +1,36 @@
+"""添加评分聚合字段
+
+Revision ID: ab90f3604dd7
+Revises: 6e5391d1a5d3
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ab90f3604dd7'
+down_revision: Union[str, None] = '6e5391d1a5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('camera', sa.Column('rating', sa.Numeric(precision=2, scale=1), nullable=True))
+    op.add_column('camera', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('camera', sa.Column('rating_sum', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'))
+    op.add_column('lens', sa.Column('rating_sum', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'))
+    # 已有数据请执行 python -m scripts.recompute_ratings 回填聚合值
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('lens', 'rating_sum')
+    op.drop_column('camera', 'rating_sum')
+    op.drop_column('camera', 'rating_count')
+    op.drop_column('camera', 'rating')
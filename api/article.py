@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import load_only
+from sqlmodel import Session, SQLModel, select
+from typing import List, Literal, Optional, Type, Union
 from datetime import datetime as dt
 
 from database.config import get_db
-from models.article import Article, ArticleCreate, ArticleUpdate, ArticleRead
+from database.pagination import apply_count_cursor, apply_published_cursor, set_next_cursor
+from models.article import Article, ArticleCreate, ArticleUpdate, ArticleRead, ArticleSummary
 from models.user import User
-from auth.auth import get_current_user
+from auth.auth import get_current_user, CurrentUser
+from services.counters import article_counters
 
 # 辅助函数：检查文章所有权
 def check_article_ownership(article_id: int, user_id: int, session: Session):
@@ -17,24 +21,56 @@ def check_article_ownership(article_id: int, user_id: int, session: Session):
         raise HTTPException(status_code=403, detail="没有权限操作此文章")
     return article
 
+def with_pending_counts(article: Article, read_model: Type[SQLModel] = ArticleRead):
+    """按响应模型转换文章，并叠加计数缓冲中尚未写回的阅读量、点赞数"""
+    return read_model.model_validate(article, from_attributes=True, update={
+        "view_count": article.view_count + article_counters.pending("view_count", article.id),
+        "like_count": article.like_count + article_counters.pending("like_count", article.id),
+    })
+
+# 列表接口按include参数显式选择序列化模型，不依赖联合类型的自动匹配
+_LIST_ADAPTERS = {
+    ArticleSummary: TypeAdapter(list[ArticleSummary]),
+    ArticleRead: TypeAdapter(list[ArticleRead]),
+}
+
 # 创建文章路由实例
 router = APIRouter(tags=["文章"], prefix="/articles")
 
 @router.get(
     '/', 
-    response_model=list[ArticleRead], 
+    response_model=None,
+    responses={200: {"model": Union[list[ArticleSummary], list[ArticleRead]]}},
     summary='获取文章列表',
-    description='获取所有文章的列表，支持分页查询',
+    description='获取所有文章的摘要列表（不含正文，include=content时附带正文），默认按发布时间倒序，sort=comment_count时按评论数倒序（最多讨论），支持skip/limit分页或cursor游标分页，下一页游标通过X-Next-Cursor响应头返回',
     response_description='成功返回文章列表数据'
 )
 def read_articles(
+    response: Response,
     session: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略skip"),
+    sort: Literal["published_at", "comment_count"] = Query("published_at", description="排序方式：published_at-发布时间，comment_count-评论数"),
+    include: Optional[Literal["content"]] = Query(None, description="传入content时返回完整文章（含正文）")
 ):
     """获取文章列表，支持分页"""
-    articles = session.exec(select(Article).offset(skip).limit(limit)).all()
-    return articles
+    if sort == "comment_count":
+        query = apply_count_cursor(select(Article), Article.comment_count, Article.id, cursor)
+        cursor_key = lambda a: (a.comment_count, a.id)
+    else:
+        query = apply_published_cursor(select(Article), Article.published_at, Article.id, cursor)
+        cursor_key = lambda a: (a.published_at, a.id)
+    if not cursor:
+        query = query.offset(skip)
+    # 默认只查询摘要所需的列，正文(Text)不读取也不序列化
+    read_model = ArticleRead if include == "content" else ArticleSummary
+    if read_model is ArticleSummary:
+        query = query.options(load_only(*(getattr(Article, name) for name in ArticleSummary.model_fields)))
+    articles = session.exec(query.limit(limit)).all()
+    set_next_cursor(response, articles, limit, key=cursor_key)
+    body = _LIST_ADAPTERS[read_model].dump_json([with_pending_counts(article, read_model) for article in articles])
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
 
 @router.get(
     '/{article_id}', 
@@ -51,7 +87,30 @@ def read_article(
     article = session.get(Article, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
-    return article
+    # 阅读量先计入进程内缓冲，由后台任务批量写回
+    article_counters.incr("view_count", article_id)
+    return with_pending_counts(article)
+
+@router.post(
+    '/{article_id}/like', 
+    summary='点赞文章',
+    description='为文章点赞，需要用户认证；点赞数先计入进程内缓冲，由后台任务批量写回数据库',
+    response_description='返回文章当前点赞数'
+)
+def like_article(
+    article_id: int,
+    session: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """点赞文章，需要登录权限"""
+    article = session.get(Article, article_id)
+    if not article:
+        raise HTTPException(status_code=404, detail="文章不存在")
+    article_counters.incr("like_count", article_id)
+    return {
+        "article_id": article_id,
+        "like_count": article.like_count + article_counters.pending("like_count", article_id)
+    }
 
 @router.post(
     '/', 
@@ -64,7 +123,7 @@ def read_article(
 def create_article(
     article: ArticleCreate,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """创建新文章，需要登录权限"""
     # 将Pydantic模型转换为数据库模型
@@ -90,7 +149,7 @@ def update_article(
     article_id: int,
     article: ArticleUpdate,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """更新文章，仅文章作者可操作"""
     db_article = check_article_ownership(article_id, current_user.id, session)
@@ -118,7 +177,7 @@ def update_article(
 def delete_article(
     article_id: int,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """删除文章，仅文章作者可操作"""
     article = check_article_ownership(article_id, current_user.id, session)
@@ -0,0 +1,30 @@
+from enum import Enum
+from typing import List, Optional
+
+from fastapi import APIRouter, Query
+
+from models.search import AutocompleteItem
+from services.autocomplete import autocomplete_index
+
+router = APIRouter(prefix="/autocomplete", tags=["搜索"])
+
+class AutocompleteType(str, Enum):
+    brand = "brand"
+    mount = "mount"
+    camera = "camera"
+    lens = "lens"
+
+@router.get(
+    "",
+    response_model=List[AutocompleteItem],
+    summary="名称自动补全",
+    description="按前缀匹配品牌、卡口、相机、镜头的中英文名称、型号及型号代码（忽略大小写与空格、连字符），"
+                "也匹配名称中任一词的开头；数据来自内存中的有序前缀索引，不访问数据库",
+    response_description="按匹配程度排序的候选列表"
+)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="输入的前缀"),
+    types: Optional[List[AutocompleteType]] = Query(None, description="限定对象类型，可多选"),
+    limit: int = Query(10, ge=1, le=50, description="返回候选数"),
+):
+    return await autocomplete_index.search(q, limit, [t.value for t in types] if types else None)
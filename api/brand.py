@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 
 from models.brand import Brand, BrandCreate, BrandUpdate, BrandRead
 from models.brand_mount_link import BrandMountLink
 from models.mount import Mount
-from database.config import get_db
+from database.config import get_async_db
+from database.links import sync_links
+from database.fields import fields_model, parse_fields, select_fields
+from utils.http_cache import conditional_response, item_validators, list_validators
+from utils.response_cache import response_cache
+from services.autocomplete import autocomplete_index
 from auth.auth import get_current_admin
 
 router = APIRouter(prefix="/brands", tags=["品牌管理"])
@@ -22,11 +27,11 @@ router = APIRouter(prefix="/brands", tags=["品牌管理"])
 async def create_brand(
     brand: BrandCreate,
     mount_ids: Optional[List[int]] = Query(None, description="关联的卡口ID列表"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    existing_brand = db.exec(
+    existing_brand = (await db.exec(
         select(Brand).where(Brand.name == brand.name)
-    ).first()
+    )).first()
     if existing_brand:
         raise HTTPException(
             status_code=400,
@@ -35,60 +40,93 @@ async def create_brand(
     
     db_brand = Brand.from_orm(brand)
     db.add(db_brand)
-    db.commit()
-    db.refresh(db_brand)
+    await db.flush()
     
-    # 处理品牌与卡口的关联
+    # 处理品牌与卡口的关联，与品牌在同一事务中提交
     if mount_ids:
-        for mount_id in mount_ids:
-            mount = db.get(Mount, mount_id)
-            if not mount:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"卡口ID {mount_id} 不存在"
-                )
-            brand_mount = BrandMountLink(brand_id=brand.id, mount_id=mount_id)
-            db.add(brand_mount)
-        db.commit()
-        db.refresh(brand)
+        await sync_links(
+            db, BrandMountLink.brand_id, BrandMountLink.mount_id,
+            db_brand.id, mount_ids, Mount.id, "卡口ID"
+        )
+    await db.commit()
+    await db.refresh(db_brand)
     
-    return brand
+    response_cache.invalidate("brand:list")
+    autocomplete_index.invalidate()
+    return db_brand
 
 @router.get(
     "/",
     response_model=List[BrandRead],
     summary="获取品牌列表",
-    description="分页查询所有相机品牌信息，包含关联的卡口信息",
+    description="分页查询所有相机品牌信息，包含关联的卡口信息，支持fields参数只返回指定字段",
     response_description="品牌列表"
 )
 async def read_brands(
+    request: Request,
+    response: Response,
     skip: Optional[int] = 0,
     limit: Optional[int] = 100,
     keyword: Optional[str] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = select(Brand).offset(skip).limit(limit).options(selectinload(Brand.mounts))
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, BrandRead)
+    query = select_fields(Brand, BrandRead, selected).offset(skip).limit(limit)
     if keyword:
         query = query.where((Brand.name.contains(keyword)) | (Brand.name_zh.contains(keyword)))
-    brands = db.exec(query).all()
-    return brands
+    brands = (await db.exec(query)).all()
+    # 条件请求：列表未变化时返回304，跳过序列化
+    etag, last_modified = list_validators(brands)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, List[fields_model(BrandRead, selected)], brands,
+        tags=["brand:list"], etag=etag, last_modified=last_modified
+    )
 
 @router.get(
     "/{brand_id}",
     response_model=BrandRead,
     summary="获取品牌详情",
-    description="根据ID查询特定相机品牌信息，包含关联的卡口信息",
+    description="根据ID查询特定相机品牌信息，包含关联的卡口信息，支持fields参数只返回指定字段",
     response_description="品牌详细信息"
 )
-async def read_brand(brand_id: int, db: Session = Depends(get_db)):
-    brand = db.exec(
-        select(Brand)
+async def read_brand(
+    brand_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, BrandRead)
+    brand = (await db.exec(
+        select_fields(Brand, BrandRead, selected)
         .where(Brand.id == brand_id)
-        .options(selectinload(Brand.mounts))  # 预加载关联的卡口信息
-    ).first()
+    )).first()
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
-    return brand
+    etag, last_modified = item_validators(brand)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, fields_model(BrandRead, selected), brand,
+        tags=[f"brand:{brand_id}"], etag=etag, last_modified=last_modified
+    )
 
 @router.put(
     "/{brand_id}",
@@ -102,16 +140,16 @@ async def update_brand(
     brand_id: int,
     brand_update: BrandUpdate,
     mount_ids: Optional[List[int]] = Query(None, description="关联的卡口ID列表，为null则不修改关联，为空列表则清除所有关联"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_brand = db.get(Brand, brand_id)
+    db_brand = await db.get(Brand, brand_id)
     if not db_brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
     if brand_update.name != db_brand.name:
-        existing_brand = db.exec(
+        existing_brand = (await db.exec(
             select(Brand).where(Brand.name == brand_update.name)
-        ).first()
+        )).first()
         if existing_brand:
             raise HTTPException(
                 status_code=400,
@@ -122,26 +160,18 @@ async def update_brand(
     for key, value in brand_data.items():
         setattr(db_brand, key, value)
     
-    # 处理品牌与卡口的关联更新
+    # 处理品牌与卡口的关联更新：只增删有变化的关联行
     if mount_ids is not None:
-        # 删除现有关联
-        db.exec(select(BrandMountLink).where(BrandMountLink.brand_id == brand_id)).delete()
-        
-        # 添加新关联
-        if mount_ids:
-            for mount_id in mount_ids:
-                mount = db.get(Mount, mount_id)
-                if not mount:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"卡口ID {mount_id} 不存在"
-                    )
-                brand_mount = BrandMountLink(brand_id=brand_id, mount_id=mount_id)
-                db.add(brand_mount)
+        await sync_links(
+            db, BrandMountLink.brand_id, BrandMountLink.mount_id,
+            brand_id, mount_ids, Mount.id, "卡口ID"
+        )
     
     db.add(db_brand)
-    db.commit()
-    db.refresh(db_brand)
+    await db.commit()
+    await db.refresh(db_brand)
+    response_cache.invalidate(f"brand:{brand_id}", "brand:list")
+    autocomplete_index.invalidate()
     return db_brand
 
 @router.delete(
@@ -151,14 +181,16 @@ async def update_brand(
     response_description="删除操作结果",
     dependencies=[Depends(get_current_admin)]
 )
-async def delete_brand(brand_id: int, db: Session = Depends(get_db)):
-    brand = db.get(Brand, brand_id)
+async def delete_brand(brand_id: int, db: AsyncSession = Depends(get_async_db)):
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
     # 先删除关联的卡口关系
-    db.exec(select(BrandMountLink).where(BrandMountLink.brand_id == brand_id)).delete()
+    await db.exec(delete(BrandMountLink).where(BrandMountLink.brand_id == brand_id))
     
-    db.delete(brand)
-    db.commit()
+    await db.delete(brand)
+    await db.commit()
+    response_cache.invalidate(f"brand:{brand_id}", "brand:list")
+    autocomplete_index.invalidate()
     return {"ok": True}
\ No newline at end of file
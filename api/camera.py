@@ -1,9 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional, Tuple
 
+from models.brand import Brand
+from models.bulk import BulkImportResult, BulkRowError
 from models.camera import Camera, CameraCreate, CameraUpdate, CameraRead
-from database.config import get_db
+from models.lens import Lens, LensRead
+from models.search import CameraLookupMatch, CameraSearchResult
+from database.bulk import bulk_conflict, check_bulk_size, existing_keys, existing_values, insert_many
+from database.config import get_async_db
+from database.fields import fields_model, parse_fields, select_fields
+from database.pagination import apply_id_cursor, set_next_cursor
+from utils.http_cache import conditional_response, item_validators, list_validators
+from utils.response_cache import response_cache
+from services.camera_search import search_cameras
+from services.compatibility import compatibility_index, load_page
+from services.model_lookup import lookup_cameras, model_code_index
+from utils.model_codes import normalize_model_code
+from services.autocomplete import autocomplete_index
 from auth.auth import get_current_admin
 
 router = APIRouter(prefix="/cameras", tags=["相机管理"])
@@ -16,10 +32,10 @@ router = APIRouter(prefix="/cameras", tags=["相机管理"])
     response_description="创建成功的相机信息",
     dependencies=[Depends(get_current_admin)]
 )
-async def create_camera(camera: CameraCreate, db: Session = Depends(get_db)):
-    existing_camera = db.exec(
+async def create_camera(camera: CameraCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_camera = (await db.exec(
         select(Camera).where(Camera.model_code == camera.model_code)
-    ).first()
+    )).first()
     if existing_camera:
         raise HTTPException(
             status_code=400,
@@ -27,44 +43,244 @@ async def create_camera(camera: CameraCreate, db: Session = Depends(get_db)):
         )
     
     db_camera = Camera.from_orm(camera)
+    db_camera.model_code_key = normalize_model_code(camera.model_code)
     db.add(db_camera)
-    db.commit()
-    db.refresh(db_camera)
+    await db.commit()
+    await db.refresh(db_camera)
+    response_cache.invalidate("camera:list")
+    autocomplete_index.invalidate()
+    model_code_index.invalidate()
+    compatibility_index.camera_changed(db_camera.id, db_camera.mount_id)
     return db_camera
 
+async def _validate_bulk_cameras(db: AsyncSession, cameras: List[CameraCreate]) -> Tuple[List[dict], List[BulkRowError]]:
+    """批量导入的逐行校验，返回待插入的行与不合法行的错误；型号代码与数据库排序规则一致，不区分大小写"""
+    existing_codes = await existing_keys(db, Camera.model_code, (c.model_code for c in cameras))
+    brand_ids = await existing_values(db, Brand.id, (c.brand_id for c in cameras))
+    
+    rows, errors, seen_codes = [], [], set()
+    for index, camera in enumerate(cameras):
+        code_key = camera.model_code.casefold() if camera.model_code is not None else None
+        if code_key is not None and (code_key in existing_codes or code_key in seen_codes):
+            errors.append(BulkRowError(index=index, detail=f"型号代码 {camera.model_code} 已存在"))
+            continue
+        if camera.brand_id not in brand_ids:
+            errors.append(BulkRowError(index=index, detail=f"品牌ID {camera.brand_id} 不存在"))
+            continue
+        seen_codes.add(code_key)
+        rows.append({
+            **Camera.from_orm(camera).model_dump(exclude={"id"}),
+            "model_code_key": normalize_model_code(camera.model_code),
+        })
+    return rows, errors
+
+@router.post(
+    "/bulk",
+    response_model=BulkImportResult,
+    summary="批量导入相机",
+    description="一次导入多台相机：型号代码唯一性（不区分大小写）与品牌是否存在各用一条IN查询校验，合法的行在同一事务中批量插入，不合法的行跳过并逐行返回错误；提交时因并发修改违反约束则整体回滚，返回409并列出冲突的行",
+    response_description="导入结果及逐行错误信息",
+    dependencies=[Depends(get_current_admin)]
+)
+async def bulk_create_cameras(cameras: List[CameraCreate], db: AsyncSession = Depends(get_async_db)):
+    check_bulk_size(cameras)
+    rows, errors = await _validate_bulk_cameras(db, cameras)
+    try:
+        await insert_many(db, Camera, rows)
+        await db.commit()
+    except IntegrityError:
+        # 校验与提交之间数据被并发修改（如品牌被删除）：回滚后按最新数据重新校验，返回冲突的行
+        await db.rollback()
+        _, conflicts = await _validate_bulk_cameras(db, cameras)
+        rejected = {error.index for error in errors}
+        raise bulk_conflict([error for error in conflicts if error.index not in rejected])
+    if rows:
+        response_cache.invalidate("camera:list")
+        autocomplete_index.invalidate()
+        model_code_index.invalidate()
+        # 批量插入拿不到自增ID，兼容性索引整体重建
+        compatibility_index.invalidate()
+    return BulkImportResult(created=len(rows), failed=len(errors), errors=errors)
+
 @router.get(
     "/",
     response_model=List[CameraRead],
     summary="获取相机列表",
-    description="分页查询所有相机信息",
+    description="分页查询所有相机信息，支持fields参数只返回指定字段，支持skip/limit分页或cursor游标分页，下一页游标通过X-Next-Cursor响应头返回",
     response_description="相机列表"
 )
 async def read_cameras(
+    request: Request,
+    response: Response,
     skip: Optional[int] = 0,
     limit: Optional[int] = 100,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略skip"),
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = select(Camera).offset(skip).limit(limit)
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, CameraRead)
+    query = apply_id_cursor(select_fields(Camera, CameraRead, selected), Camera.id, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    query = query.limit(limit)
     if search:
         query = query.where(Camera.model_code.contains(search))
-    cameras = db.exec(query).all()
-    return cameras
+    cameras = (await db.exec(query)).all()
+    set_next_cursor(response, cameras, limit)
+    # 条件请求：列表未变化时返回304，跳过序列化
+    etag, last_modified = list_validators(cameras)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, List[fields_model(CameraRead, selected)], cameras,
+        tags=["camera:list"], etag=etag, last_modified=last_modified
+    )
+
+@router.get(
+    "/search",
+    response_model=CameraSearchResult,
+    summary="相机分面搜索",
+    description="按品牌、卡口、传感器尺寸/类型、相机类型多选过滤（同一维度多个取值为或），并按发布年份、分辨率、最高ISO范围过滤；"
+                "同时返回各维度的取值计数，由一条分组查询汇总得到",
+    response_description="当前页相机、总数及分面计数"
+)
+async def search_cameras_faceted(
+    request: Request,
+    response: Response,
+    brand_id: Optional[List[int]] = Query(None, description="品牌ID，可多选"),
+    mount_id: Optional[List[int]] = Query(None, description="卡口ID，可多选"),
+    sensor_size: Optional[List[str]] = Query(None, description="传感器尺寸，可多选"),
+    sensor_type: Optional[List[str]] = Query(None, description="传感器类型，可多选"),
+    type: Optional[List[str]] = Query(None, description="相机类型，可多选"),
+    release_year: Optional[List[int]] = Query(None, description="发布年份，可多选"),
+    year_min: Optional[int] = Query(None, description="最早发布年份"),
+    year_max: Optional[int] = Query(None, description="最晚发布年份"),
+    resolution_min: Optional[float] = Query(None, description="最低分辨率(MP)"),
+    resolution_max: Optional[float] = Query(None, description="最高分辨率(MP)"),
+    max_iso_min: Optional[int] = Query(None, description="最高ISO下限"),
+    max_iso_max: Optional[int] = Query(None, description="最高ISO上限"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    ranges = (
+        (Camera.release_year, year_min, year_max),
+        (Camera.resolution, resolution_min, resolution_max),
+        (Camera.max_iso, max_iso_min, max_iso_max),
+    )
+    conditions = [column >= low for column, low, _ in ranges if low is not None]
+    conditions += [column <= high for column, _, high in ranges if high is not None]
+    selected = {
+        "brand_id": brand_id,
+        "mount_id": mount_id,
+        "sensor_size": sensor_size,
+        "sensor_type": sensor_type,
+        "type": type,
+        "release_year": release_year,
+    }
+    result, (etag, last_modified) = await search_cameras(db, selected, conditions, skip, limit)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, CameraSearchResult, result,
+        tags=["camera:list"], etag=etag, last_modified=last_modified
+    )
+
+@router.get(
+    "/lookup",
+    response_model=List[CameraLookupMatch],
+    summary="按型号代码查找相机",
+    description="型号代码经规范化（忽略大小写与分隔符、罗马数字与Mark代数写法统一、别名替换）后在索引列上精确匹配，"
+                "如 A7M4、a7 iv、ILCE-7M4 视为同一型号；没有精确结果时回退到三元组相似度，返回得分最高的候选",
+    response_description="匹配的相机及得分，按得分降序"
+)
+async def lookup_camera(
+    code: str = Query(..., min_length=1, max_length=100, description="用户输入的型号代码"),
+    limit: int = Query(5, ge=1, le=20, description="返回候选数"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    matches = await lookup_cameras(db, code, limit)
+    if matches is None:
+        raise HTTPException(status_code=400, detail="无效的型号代码")
+    return matches
 
 @router.get(
     "/{camera_id}",
     response_model=CameraRead,
     summary="获取相机详情",
-    description="根据ID查询特定相机信息",
+    description="根据ID查询特定相机信息，支持fields参数只返回指定字段",
     response_description="相机详细信息"
 )
-async def read_camera(camera_id: int, db: Session = Depends(get_db)):
-    camera = db.exec(
-        select(Camera).where(Camera.id == camera_id)
-    ).first()
+async def read_camera(
+    camera_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, CameraRead)
+    camera = (await db.exec(
+        select_fields(Camera, CameraRead, selected).where(Camera.id == camera_id)
+    )).first()
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
-    return camera
+    etag, last_modified = item_validators(camera)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, fields_model(CameraRead, selected), camera,
+        tags=[f"camera:{camera_id}"], etag=etag, last_modified=last_modified
+    )
+
+@router.get(
+    "/{camera_id}/compatible-lenses",
+    response_model=List[LensRead],
+    summary="适用镜头",
+    description="查询卡口与该相机一致的镜头，可按品牌、覆盖焦距、最大光圈筛选；镜头ID来自内存中的兼容性索引，不做多表JOIN",
+    response_description="按ID升序的镜头列表"
+)
+async def read_compatible_lenses(
+    camera_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    brand_id: Optional[int] = Query(None, description="按品牌ID筛选"),
+    focal_mm: Optional[float] = Query(None, gt=0, description="焦段需覆盖的焦距(mm)"),
+    aperture: Optional[float] = Query(None, gt=0, description="最大光圈不小于该值，即最小f值不大于该值，如2.8"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    lens_ids = await compatibility_index.lenses_for_camera(db, camera_id)
+    if lens_ids is None:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    conditions = []
+    if brand_id is not None:
+        conditions.append(Lens.brand_id == brand_id)
+    if focal_mm is not None:
+        conditions += [Lens.focal_min_mm <= focal_mm, Lens.focal_max_mm >= focal_mm]
+    if aperture is not None:
+        conditions.append(Lens.aperture_min <= aperture)
+    return await load_page(db, Lens, lens_ids, conditions, skip, limit)
 
 @router.put(
     "/{camera_id}",
@@ -77,16 +293,16 @@ async def read_camera(camera_id: int, db: Session = Depends(get_db)):
 async def update_camera(
     camera_id: int,
     camera_update: CameraUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_camera = db.get(Camera, camera_id)
+    db_camera = await db.get(Camera, camera_id)
     if not db_camera:
         raise HTTPException(status_code=404, detail="Camera not found")
     
     if camera_update.model_code and camera_update.model_code != db_camera.model_code:
-        existing_camera = db.exec(
+        existing_camera = (await db.exec(
             select(Camera).where(Camera.model_code == camera_update.model_code)
-        ).first()
+        )).first()
         if existing_camera:
             raise HTTPException(
                 status_code=400,
@@ -96,10 +312,16 @@ async def update_camera(
     camera_data = camera_update.dict(exclude_unset=True)
     for key, value in camera_data.items():
         setattr(db_camera, key, value)
+    if "model_code" in camera_data:
+        db_camera.model_code_key = normalize_model_code(db_camera.model_code)
     
     db.add(db_camera)
-    db.commit()
-    db.refresh(db_camera)
+    await db.commit()
+    await db.refresh(db_camera)
+    response_cache.invalidate(f"camera:{camera_id}", "camera:list")
+    autocomplete_index.invalidate()
+    model_code_index.invalidate()
+    compatibility_index.camera_changed(camera_id, db_camera.mount_id)
     return db_camera
 
 @router.delete(
@@ -109,11 +331,15 @@ async def update_camera(
     response_description="删除操作结果",
     dependencies=[Depends(get_current_admin)]
 )
-async def delete_camera(camera_id: int, db: Session = Depends(get_db)):
-    camera = db.get(Camera, camera_id)
+async def delete_camera(camera_id: int, db: AsyncSession = Depends(get_async_db)):
+    camera = await db.get(Camera, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
     
-    db.delete(camera)
-    db.commit()
+    await db.delete(camera)
+    await db.commit()
+    response_cache.invalidate(f"camera:{camera_id}", "camera:list")
+    autocomplete_index.invalidate()
+    model_code_index.invalidate()
+    compatibility_index.camera_removed(camera_id)
     return {"ok": True}
\ No newline at end of file
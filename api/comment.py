@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Response
+from sqlalchemy import literal
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from database.config import get_db
-from models.comment import Comment, CommentCreate, CommentUpdate, CommentRead
+from database.pagination import apply_id_cursor, set_next_cursor
+from models.comment import Comment, CommentCreate, CommentUpdate, CommentRead, CommentTreeNode
 from models.article import Article
 from models.user import User
-from auth.auth import get_current_user
+from auth.auth import get_current_user, CurrentUser
+from services.articles import adjust_comment_count
 
 # 创建评论路由实例，路径包含文章ID以关联评论所属文章
 router = APIRouter(tags=["评论"], prefix="/articles/{article_id}/comments")
@@ -20,10 +24,12 @@ router = APIRouter(tags=["评论"], prefix="/articles/{article_id}/comments")
     response_description='成功返回评论列表数据'
 )
 def read_comments(
+    response: Response,
     article_id: int = Path(..., description="文章ID"),
     session: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略skip")
 ):
     """获取指定文章的评论列表，支持分页"""
     # 验证文章是否存在
@@ -31,15 +37,82 @@ def read_comments(
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
     
-    # 查询该文章的所有评论
+    # 查询该文章的所有评论，按ID升序做键集分页
+    query = apply_id_cursor(select(Comment), Comment.id, cursor)
+    if not cursor:
+        query = query.offset(skip)
     comments = session.exec(
-        select(Comment)
+        query
         .where(Comment.article_id == article_id)
-        .offset(skip)
         .limit(limit)
     ).all()
+    set_next_cursor(response, comments, limit)
     return comments
 
+@router.get(
+    '/tree', 
+    response_model=list[CommentTreeNode], 
+    summary='获取评论树',
+    description='按根评论分页获取评论树，每页的根评论及其全部回复通过一条递归查询取出，可限制回复层级',
+    response_description='成功返回嵌套的评论树'
+)
+def read_comment_tree(
+    response: Response,
+    article_id: int = Path(..., description="文章ID"),
+    session: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100, description="每页根评论数"),
+    cursor: Optional[str] = Query(None, description="分页游标（按根评论），传入后忽略skip"),
+    max_depth: Optional[int] = Query(None, ge=0, description="最大回复层级，根评论为0，不传则返回全部层级")
+):
+    """获取指定文章的评论树，按根评论ID升序分页"""
+    # 验证文章是否存在
+    article = session.get(Article, article_id)
+    if not article:
+        raise HTTPException(status_code=404, detail="文章不存在")
+    
+    # 当前页的根评论；MySQL不支持IN子查询中带LIMIT，包一层派生表
+    roots = apply_id_cursor(select(Comment.id), Comment.id, cursor).where(
+        Comment.article_id == article_id,
+        Comment.parent_id.is_(None)
+    )
+    if not cursor:
+        roots = roots.offset(skip)
+    roots = roots.limit(limit).subquery("roots")
+    
+    # 递归CTE：从根评论出发逐层向下查找回复
+    tree = (
+        select(Comment.id.label("id"), literal(0).label("depth"))
+        .where(Comment.id.in_(select(roots.c.id)))
+        .cte("comment_tree", recursive=True)
+    )
+    reply = aliased(Comment)
+    step = select(reply.id, tree.c.depth + 1).where(reply.parent_id == tree.c.id)
+    if max_depth is not None:
+        step = step.where(tree.c.depth < max_depth)
+    tree = tree.union_all(step)
+    
+    rows = session.exec(
+        select(Comment, tree.c.depth)
+        .join(tree, tree.c.id == Comment.id)
+        .order_by(Comment.id)
+    ).all()
+    
+    # 在内存中一次遍历组装树：先建节点，再挂到父节点下
+    nodes = {
+        comment.id: CommentTreeNode.model_validate(comment, from_attributes=True, update={"depth": depth})
+        for comment, depth in rows
+    }
+    tree_roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.parent_id) if node.depth else None
+        if parent is not None:
+            parent.replies.append(node)
+        else:
+            tree_roots.append(node)
+    set_next_cursor(response, tree_roots, limit)
+    return tree_roots
+
 @router.get(
     '/{comment_id}', 
     response_model=CommentRead, 
@@ -78,7 +151,7 @@ def create_comment(
     article_id: int = Path(..., description="文章ID"),
     comment: CommentCreate,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """为指定文章创建新评论，需要登录权限"""
     # 验证文章是否存在
@@ -94,6 +167,8 @@ def create_comment(
     db_comment.updated_at = datetime.utcnow()
     
     session.add(db_comment)
+    # 同一事务内更新文章的评论数
+    adjust_comment_count(session, article_id, 1)
     session.commit()
     session.refresh(db_comment)
     return db_comment
@@ -111,7 +186,7 @@ def update_comment(
     comment_id: int = Path(..., description="评论ID"),
     comment: CommentUpdate,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """更新评论，仅评论作者可操作"""
     # 验证文章是否存在
@@ -152,7 +227,7 @@ def delete_comment(
     article_id: int = Path(..., description="文章ID"),
     comment_id: int = Path(..., description="评论ID"),
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """删除评论，仅评论作者可操作"""
     # 验证文章是否存在
@@ -170,5 +245,6 @@ def delete_comment(
         raise HTTPException(status_code=403, detail="没有权限删除此评论")
     
     session.delete(comment)
+    adjust_comment_count(session, article_id, -1)
     session.commit()
     return {}
\ No newline at end of file
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime as dt
+from decimal import Decimal
+from enum import Enum
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from sqlmodel import func, select
+
+from models.brand import Brand
+from models.brand_mount_link import BrandMountLink
+from models.camera import Camera
+from models.lens import Lens
+from models.lens_mount_link import LensMountLink
+from models.mount import Mount
+from database.config import AsyncSessionLocal
+from auth.auth import get_current_admin
+
+router = APIRouter(prefix="/export", tags=["数据导出"])
+
+# 每批从服务端游标取出的行数，同时也是每次向客户端写出的行数
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+class ExportEntity(str, Enum):
+    cameras = "cameras"
+    lenses = "lenses"
+    brands = "brands"
+    mounts = "mounts"
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# 导出会话的GROUP_CONCAT结果长度上限（字节），MySQL默认仅1024，关联名称较多时会被截断
+EXPORT_GROUP_CONCAT_MAX_LEN = int(os.getenv("EXPORT_GROUP_CONCAT_MAX_LEN", str(16 * 1024 * 1024)))
+
+# 名称列表列：数据库内以单元分隔符(US)拼接，名称本身可能含逗号；NDJSON中输出为数组，CSV中输出为JSON数组文本
+_LIST_COLUMNS = ("mount_names", "brand_names")
+_LIST_SEPARATOR = "\x1f"
+
+def _names_subquery(name_column, link_model, link_target_id, link_owner_id, owner_id):
+    """关联名称的相关子查询（GROUP_CONCAT），在数据库内随主查询一起计算，不产生逐行查询"""
+    return (
+        select(func.aggregate_strings(name_column, _LIST_SEPARATOR))
+        .join(link_model, link_target_id == name_column.table.c.id)
+        .where(link_owner_id == owner_id)
+        .scalar_subquery()
+    )
+
+def _export_query(entity: ExportEntity, relations: bool):
+    """按实体构造导出查询：只选取列，不构造ORM对象"""
+    if entity == ExportEntity.cameras:
+        query = select(*Camera.__table__.c)
+        if relations:
+            query = (
+                query.add_columns(Brand.name.label("brand_name"), Mount.name.label("mount_name"))
+                .outerjoin(Brand, Brand.id == Camera.brand_id)
+                .outerjoin(Mount, Mount.id == Camera.mount_id)
+            )
+        return query.order_by(Camera.id)
+    if entity == ExportEntity.lenses:
+        query = select(*Lens.__table__.c)
+        if relations:
+            query = query.add_columns(
+                Brand.name.label("brand_name"),
+                _names_subquery(
+                    Mount.name, LensMountLink, LensMountLink.mount_id, LensMountLink.lens_id, Lens.id
+                ).label("mount_names"),
+            ).outerjoin(Brand, Brand.id == Lens.brand_id)
+        return query.order_by(Lens.id)
+    if entity == ExportEntity.brands:
+        query = select(*Brand.__table__.c)
+        if relations:
+            query = query.add_columns(_names_subquery(
+                Mount.name, BrandMountLink, BrandMountLink.mount_id, BrandMountLink.brand_id, Brand.id
+            ).label("mount_names"))
+        return query.order_by(Brand.id)
+    query = select(*Mount.__table__.c)
+    if relations:
+        query = query.add_columns(_names_subquery(
+            Brand.name, BrandMountLink, BrandMountLink.brand_id, BrandMountLink.mount_id, Mount.id
+        ).label("brand_names"))
+    return query.order_by(Mount.id)
+
+def _json_default(value):
+    if isinstance(value, (dt, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+def _split_names(value) -> list:
+    return value.split(_LIST_SEPARATOR) if value else []
+
+def _ndjson_chunk(rows) -> str:
+    lines = []
+    for row in rows:
+        record = dict(row._mapping)
+        for column in _LIST_COLUMNS:
+            if column in record:
+                record[column] = _split_names(record[column])
+        lines.append(json.dumps(record, ensure_ascii=False, default=_json_default))
+    return "\n".join(lines) + "\n"
+
+def _csv_chunk(rows, header=None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    for row in rows:
+        record = row._mapping
+        writer.writerow([
+            json.dumps(_split_names(record[column]), ensure_ascii=False) if column in _LIST_COLUMNS else record[column]
+            for column in record.keys()
+        ])
+    return buffer.getvalue()
+
+async def _stream_export(query, fmt: ExportFormat):
+    """
+    使用服务端游标(yield_per)分批读取并逐批写出，内存占用与表大小无关
+    依赖注入的会话在响应开始前就会关闭，因此这里自行创建会话
+    """
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name in ("mysql", "mariadb"):
+            # 放宽本次导出所用连接的上限，避免关联名称列表被截断；连接归还连接池后该设置保留，对其他查询无影响
+            await db.exec(text(f"SET SESSION group_concat_max_len = {EXPORT_GROUP_CONCAT_MAX_LEN:d}"))
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        header = list(result.keys())
+        if fmt == ExportFormat.csv:
+            # 带BOM，便于Excel正确识别UTF-8中文
+            yield "\ufeff" + _csv_chunk([], header)
+        async for partition in result.partitions():
+            yield _ndjson_chunk(partition) if fmt == ExportFormat.ndjson else _csv_chunk(partition)
+
+@router.get(
+    "/{entity}.{fmt}",
+    response_class=StreamingResponse,
+    summary="导出目录数据",
+    description="以NDJSON或CSV格式流式导出全部相机、镜头、品牌或卡口，可选附带品牌名称、卡口名称等关联信息",
+    response_description="NDJSON或CSV文件流",
+    dependencies=[Depends(get_current_admin)]
+)
+async def export_entity(
+    entity: ExportEntity,
+    fmt: ExportFormat,
+    relations: bool = Query(False, description="是否附带关联信息（品牌名称、卡口名称）"),
+):
+    media_type = "application/x-ndjson" if fmt == ExportFormat.ndjson else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        _stream_export(_export_query(entity, relations), fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{entity.value}.{fmt.value}"'}
+    )
@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, List, Optional, Set, Tuple
 
-from models.lens import Lens, LensCreate, LensUpdate, LensRead
+from models.brand import Brand
+from models.bulk import BulkImportResult, BulkRowError
+from models.camera import Camera, CameraRead
+from models.lens import Lens, LensBulkItem, LensCreate, LensUpdate, LensRead
 from models.lens_mount_link import LensMountLink
 from models.mount import Mount
-from database.config import get_db
+from database.bulk import bulk_conflict, check_bulk_size, existing_keys, existing_values, insert_many
+from database.config import get_async_db
+from database.links import sync_links
+from database.fields import fields_model, parse_fields, select_fields
+from database.pagination import apply_id_cursor, set_next_cursor
+from utils.lens_specs import lens_spec_columns
+from utils.http_cache import conditional_response, item_validators, list_validators
+from utils.response_cache import response_cache
+from services.compatibility import compatibility_index, load_page
+from services.autocomplete import autocomplete_index
 from auth.auth import get_current_admin
 
 router = APIRouter(prefix="/lenses", tags=["镜头管理"])
@@ -22,11 +35,11 @@ router = APIRouter(prefix="/lenses", tags=["镜头管理"])
 async def create_lens(
     lens: LensCreate,
     mount_ids: Optional[List[int]] = Query(None, description="关联的卡口ID列表"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    existing_lens = db.exec(
+    existing_lens = (await db.exec(
         select(Lens).where(Lens.model == lens.model)
-    ).first()
+    )).first()
     if existing_lens:
         raise HTTPException(
             status_code=400,
@@ -34,62 +47,199 @@ async def create_lens(
         )
     
     db_lens = Lens.from_orm(lens)
+    for key, value in lens_spec_columns(lens.focal_length, lens.aperture_range).items():
+        setattr(db_lens, key, value)
     db.add(db_lens)
-    db.commit()
-    db.refresh(db_lens)
+    await db.flush()
     
-    # 处理镜头与卡口的关联
+    # 处理镜头与卡口的关联，与镜头在同一事务中提交
     if mount_ids:
-        for mount_id in mount_ids:
-            mount = db.get(Mount, mount_id)
-            if not mount:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"卡口ID {mount_id} 不存在"
-                )
-            lens_mount = LensMountLink(lens_id=lens.id, mount_id=mount_id)
-            db.add(lens_mount)
-        db.commit()
-        db.refresh(lens)
+        await sync_links(
+            db, LensMountLink.lens_id, LensMountLink.mount_id,
+            db_lens.id, mount_ids, Mount.id, "卡口ID"
+        )
+    await db.commit()
+    await db.refresh(db_lens)
+    
+    response_cache.invalidate("lens:list")
+    autocomplete_index.invalidate()
+    compatibility_index.lens_changed(db_lens.id, mount_ids or [])
+    return db_lens
+
+async def _validate_bulk_lenses(db: AsyncSession, lenses: List[LensBulkItem]) -> Tuple[List[dict], Dict[str, Set[int]], List[BulkRowError]]:
+    """批量导入的逐行校验，返回待插入的行、型号 -> 卡口ID关联与不合法行的错误；型号与数据库排序规则一致，不区分大小写"""
+    existing_models = await existing_keys(db, Lens.model, (l.model for l in lenses))
+    brand_ids = await existing_values(db, Brand.id, (l.brand_id for l in lenses))
+    mount_ids = await existing_values(db, Mount.id, (m for l in lenses for m in l.mount_ids))
     
-    return lens
+    rows, links, errors, seen_models = [], {}, [], set()
+    for index, lens in enumerate(lenses):
+        model_key = lens.model.casefold()
+        if model_key in existing_models or model_key in seen_models:
+            errors.append(BulkRowError(index=index, detail=f"镜头型号 {lens.model} 已存在"))
+            continue
+        if lens.brand_id is not None and lens.brand_id not in brand_ids:
+            errors.append(BulkRowError(index=index, detail=f"品牌ID {lens.brand_id} 不存在"))
+            continue
+        missing = [m for m in lens.mount_ids if m not in mount_ids]
+        if missing:
+            errors.append(BulkRowError(index=index, detail=f"卡口ID {', '.join(map(str, missing))} 不存在"))
+            continue
+        seen_models.add(model_key)
+        rows.append({
+            **Lens.from_orm(lens).model_dump(exclude={"id"}),
+            **lens_spec_columns(lens.focal_length, lens.aperture_range),
+        })
+        links[lens.model] = set(lens.mount_ids)
+    return rows, links, errors
+
+@router.post(
+    "/bulk",
+    response_model=BulkImportResult,
+    summary="批量导入镜头",
+    description="一次导入多个镜头及其卡口关联：型号唯一性（不区分大小写）、品牌与卡口是否存在各用一条IN查询校验，合法的行在同一事务中批量插入，不合法的行跳过并逐行返回错误；提交时因并发修改违反约束则整体回滚，返回409并列出冲突的行",
+    response_description="导入结果及逐行错误信息",
+    dependencies=[Depends(get_current_admin)]
+)
+async def bulk_create_lenses(lenses: List[LensBulkItem], db: AsyncSession = Depends(get_async_db)):
+    check_bulk_size(lenses)
+    rows, links, errors = await _validate_bulk_lenses(db, lenses)
+    
+    try:
+        await insert_many(db, Lens, rows)
+        # 批量插入拿不到自增ID，按型号一次查回新行的ID后再批量写入卡口关联
+        if any(links.values()):
+            created = (await db.exec(
+                select(Lens.id, Lens.model).where(Lens.model.in_(list(links)))
+            )).all()
+            await insert_many(db, LensMountLink, [
+                LensMountLink(lens_id=lens_id, mount_id=mount_id).model_dump()
+                for lens_id, model in created
+                for mount_id in links.get(model, ())
+            ])
+        await db.commit()
+    except IntegrityError:
+        # 校验与提交之间数据被并发修改（如卡口被删除）：回滚后按最新数据重新校验，返回冲突的行
+        await db.rollback()
+        _, _, conflicts = await _validate_bulk_lenses(db, lenses)
+        rejected = {error.index for error in errors}
+        raise bulk_conflict([error for error in conflicts if error.index not in rejected])
+    if rows:
+        response_cache.invalidate("lens:list")
+        autocomplete_index.invalidate()
+    if any(links.values()):
+        for lens_id, model in created:
+            compatibility_index.lens_changed(lens_id, links.get(model, ()))
+    return BulkImportResult(created=len(rows), failed=len(errors), errors=errors)
 
 @router.get(
     "/",
     response_model=List[LensRead],
     summary="获取镜头列表",
-    description="分页查询所有镜头信息，包含关联的卡口信息",
+    description="分页查询所有镜头信息，包含关联的卡口信息，可按覆盖焦距(focal_mm)与最大光圈(aperture)筛选，支持fields参数只返回指定字段，支持skip/limit分页或cursor游标分页，下一页游标通过X-Next-Cursor响应头返回",
     response_description="镜头列表"
 )
 async def read_lenses(
+    request: Request,
+    response: Response,
     skip: Optional[int] = 0,
     limit: Optional[int] = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略skip"),
+    focal_mm: Optional[float] = Query(None, gt=0, description="焦段需覆盖的焦距(mm)"),
+    aperture: Optional[float] = Query(None, gt=0, description="最大光圈不小于该值，即最小f值不大于该值，如2.8"),
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    lenses = db.exec(
-        select(Lens)
-        .offset(skip)
-        .limit(limit)
-        .options(selectinload(Lens.mounts))  # 预加载关联的卡口信息
-    ).all()
-    return lenses
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, LensRead)
+    query = apply_id_cursor(select_fields(Lens, LensRead, selected), Lens.id, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    # 数值规格列上的范围条件，由索引完成筛选
+    if focal_mm is not None:
+        query = query.where(Lens.focal_min_mm <= focal_mm, Lens.focal_max_mm >= focal_mm)
+    if aperture is not None:
+        query = query.where(Lens.aperture_min <= aperture)
+    lenses = (await db.exec(query.limit(limit))).all()
+    set_next_cursor(response, lenses, limit)
+    # 条件请求：列表未变化时返回304，跳过序列化
+    etag, last_modified = list_validators(lenses)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, List[fields_model(LensRead, selected)], lenses,
+        tags=["lens:list"], etag=etag, last_modified=last_modified
+    )
 
 @router.get(
     "/{lens_id}",
     response_model=LensRead,
     summary="获取镜头详情",
-    description="根据ID查询特定镜头信息，包含关联的卡口信息",
+    description="根据ID查询特定镜头信息，包含关联的卡口信息，支持fields参数只返回指定字段",
     response_description="镜头详细信息"
 )
-async def read_lens(lens_id: int, db: Session = Depends(get_db)):
-    lens = db.exec(
-        select(Lens)
+async def read_lens(
+    lens_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, LensRead)
+    lens = (await db.exec(
+        select_fields(Lens, LensRead, selected)
         .where(Lens.id == lens_id)
-        .options(selectinload(Lens.mounts))  # 预加载关联的卡口信息
-    ).first()
+    )).first()
     if not lens:
         raise HTTPException(status_code=404, detail="Lens not found")
-    return lens
+    etag, last_modified = item_validators(lens)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, fields_model(LensRead, selected), lens,
+        tags=[f"lens:{lens_id}"], etag=etag, last_modified=last_modified
+    )
+
+@router.get(
+    "/{lens_id}/compatible-cameras",
+    response_model=List[CameraRead],
+    summary="适用相机",
+    description="查询卡口与该镜头任一卡口一致的相机，可按品牌、传感器尺寸、相机类型筛选；相机ID来自内存中的兼容性索引，不做多表JOIN",
+    response_description="按ID升序的相机列表"
+)
+async def read_compatible_cameras(
+    lens_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    brand_id: Optional[int] = Query(None, description="按品牌ID筛选"),
+    sensor_size: Optional[str] = Query(None, description="按传感器尺寸筛选"),
+    type: Optional[str] = Query(None, description="按相机类型筛选"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    camera_ids = await compatibility_index.cameras_for_lens(db, lens_id)
+    if camera_ids is None:
+        raise HTTPException(status_code=404, detail="Lens not found")
+    conditions = []
+    if brand_id is not None:
+        conditions.append(Camera.brand_id == brand_id)
+    if sensor_size is not None:
+        conditions.append(Camera.sensor_size == sensor_size)
+    if type is not None:
+        conditions.append(Camera.type == type)
+    return await load_page(db, Camera, camera_ids, conditions, skip, limit)
 
 @router.put(
     "/{lens_id}",
@@ -103,16 +253,16 @@ async def update_lens(
     lens_id: int,
     lens_update: LensUpdate,
     mount_ids: Optional[List[int]] = Query(None, description="关联的卡口ID列表，为null则不修改关联，为空列表则清除所有关联"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_lens = db.get(Lens, lens_id)
+    db_lens = await db.get(Lens, lens_id)
     if not db_lens:
         raise HTTPException(status_code=404, detail="Lens not found")
     
     if lens_update.model != db_lens.model:
-        existing_lens = db.exec(
+        existing_lens = (await db.exec(
             select(Lens).where(Lens.model == lens_update.model)
-        ).first()
+        )).first()
         if existing_lens:
             raise HTTPException(
                 status_code=400,
@@ -122,27 +272,25 @@ async def update_lens(
     lens_data = lens_update.dict(exclude_unset=True)
     for key, value in lens_data.items():
         setattr(db_lens, key, value)
+    # 焦距、光圈文本变化时重新解析数值规格列
+    if "focal_length" in lens_data or "aperture_range" in lens_data:
+        for key, value in lens_spec_columns(db_lens.focal_length, db_lens.aperture_range).items():
+            setattr(db_lens, key, value)
     
-    # 处理镜头与卡口的关联更新
+    # 处理镜头与卡口的关联更新：只增删有变化的关联行
     if mount_ids is not None:
-        # 删除现有关联
-        db.exec(select(LensMountLink).where(LensMountLink.lens_id == lens_id)).delete()
-        
-        # 添加新关联
-        if mount_ids:
-            for mount_id in mount_ids:
-                mount = db.get(Mount, mount_id)
-                if not mount:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"卡口ID {mount_id} 不存在"
-                    )
-                lens_mount = LensMountLink(lens_id=lens_id, mount_id=mount_id)
-                db.add(lens_mount)
+        await sync_links(
+            db, LensMountLink.lens_id, LensMountLink.mount_id,
+            lens_id, mount_ids, Mount.id, "卡口ID"
+        )
     
     db.add(db_lens)
-    db.commit()
-    db.refresh(db_lens)
+    await db.commit()
+    await db.refresh(db_lens)
+    response_cache.invalidate(f"lens:{lens_id}", "lens:list")
+    autocomplete_index.invalidate()
+    if mount_ids is not None:
+        compatibility_index.lens_changed(lens_id, mount_ids)
     return db_lens
 
 @router.delete(
@@ -152,11 +300,14 @@ async def update_lens(
     response_description="删除操作结果",
     dependencies=[Depends(get_current_admin)]
 )
-async def delete_lens(lens_id: int, db: Session = Depends(get_db)):
-    lens = db.get(Lens, lens_id)
+async def delete_lens(lens_id: int, db: AsyncSession = Depends(get_async_db)):
+    lens = await db.get(Lens, lens_id)
     if not lens:
         raise HTTPException(status_code=404, detail="Lens not found")
     
-    db.delete(lens)
-    db.commit()
+    await db.delete(lens)
+    await db.commit()
+    response_cache.invalidate(f"lens:{lens_id}", "lens:list")
+    autocomplete_index.invalidate()
+    compatibility_index.lens_removed(lens_id)
     return {"ok": True}
\ No newline at end of file
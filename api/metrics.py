@@ -0,0 +1,80 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from auth import auth
+from auth.auth import user_cache
+from database.config import engine, async_engine
+from middleware.metrics import register_cache, register_collector, render_metrics
+from services.counters import article_counters
+from services.ratings import summary_cache
+from utils.response_cache import response_cache
+
+router = APIRouter(tags=["监控"])
+
+def _pool_waiters(pool) -> int:
+    """等待连接的协程/线程数（读取队列内部状态，取不到时为0）"""
+    queue = getattr(pool, "_pool", None)
+    condition = getattr(queue, "not_empty", None)
+    if condition is not None:
+        # 同步QueuePool：等待在条件变量上的线程
+        return len(getattr(condition, "_waiters", ()))
+    # 异步AsyncAdaptedQueuePool：等待在asyncio.Queue上的协程
+    return len(getattr(getattr(queue, "_queue", None), "_getters", ()) or ())
+
+def _pool_collector():
+    """SQLAlchemy连接池状态：已签出、溢出与等待中的连接数"""
+    pools = {"sync": engine.pool, "async": async_engine.pool}
+    checked_out, overflow, waiters, size = [], [], [], []
+    for name, pool in pools.items():
+        labels = {"engine": name}
+        checked_out.append(("db_pool_checked_out", labels, pool.checkedout()))
+        overflow.append(("db_pool_overflow", labels, max(pool.overflow(), 0)))
+        waiters.append(("db_pool_waiters", labels, _pool_waiters(pool)))
+        size.append(("db_pool_size", labels, pool.size()))
+    return [
+        ("db_pool_checked_out", "已签出的连接数", "gauge", checked_out),
+        ("db_pool_overflow", "超出pool_size的溢出连接数", "gauge", overflow),
+        ("db_pool_waiters", "等待获取连接的请求数", "gauge", waiters),
+        ("db_pool_size", "连接池容量", "gauge", size),
+    ]
+
+def _password_pool_collector():
+    """密码哈希执行器的排队深度"""
+    return [
+        ("password_hash_pending", "排队及执行中的密码哈希任务数", "gauge",
+         [("password_hash_pending", {}, auth.password_pending)]),
+        ("password_hash_max_pending", "密码哈希任务排队上限", "gauge",
+         [("password_hash_max_pending", {}, auth.PASSWORD_HASH_MAX_PENDING)]),
+    ]
+
+def _response_cache_collector():
+    """响应缓存占用的字节数"""
+    return [
+        ("response_cache_bytes", "响应缓存占用的字节数", "gauge",
+         [("response_cache_bytes", {}, response_cache.size_bytes)]),
+    ]
+
+def _counter_buffer_collector():
+    """尚未写回数据库的计数缓冲条目"""
+    return [
+        ("counter_buffer_pending", "尚未写回数据库的计数条目数", "gauge",
+         [("counter_buffer_pending", {"buffer": "article"}, article_counters.pending_total())]),
+    ]
+
+register_collector(_pool_collector)
+register_collector(_password_pool_collector)
+register_collector(_response_cache_collector)
+register_collector(_counter_buffer_collector)
+register_cache("auth_user", user_cache)
+register_cache("response", response_cache)
+register_cache("rating_summary", summary_cache)
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="监控指标",
+    description="以Prometheus文本格式输出请求计数、按路由模板统计的耗时直方图及连接池状态",
+    response_description="Prometheus文本格式指标"
+)
+async def read_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException,Body
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException,Body, Query, Request, Response
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 
 from models.mount import Mount, MountCreate, MountUpdate, MountRead
-from database.config import get_db
+from database.config import get_async_db
+from database.links import sync_links
+from database.fields import fields_model, parse_fields, select_fields
+from utils.http_cache import conditional_response, item_validators, list_validators
+from utils.response_cache import response_cache
+from services.autocomplete import autocomplete_index
 from auth.auth import get_current_admin
 
 router = APIRouter(prefix="/mounts", tags=["卡口管理"])
@@ -16,7 +22,7 @@ router = APIRouter(prefix="/mounts", tags=["卡口管理"])
     response_description="创建成功的卡口信息",
     dependencies=[Depends(get_current_admin)]
 )
-async def create_mount(mount: MountCreate, brand_ids: List[int] = None, db: Session = Depends(get_db)):
+async def create_mount(mount: MountCreate, brand_ids: List[int] = None, db: AsyncSession = Depends(get_async_db)):
     """
     创建卡口并关联品牌
     :param mount: 卡口基本信息
@@ -24,9 +30,9 @@ async def create_mount(mount: MountCreate, brand_ids: List[int] = None, db: Sess
     :param db: 数据库会话
     :return: 创建成功的卡口信息
     """
-    existing_mount = db.exec(
+    existing_mount = (await db.exec(
         select(Mount).where(Mount.name == mount.name)
-    ).first()
+    )).first()
     if existing_mount:
         raise HTTPException(
             status_code=400,
@@ -35,76 +41,94 @@ async def create_mount(mount: MountCreate, brand_ids: List[int] = None, db: Sess
     
     db_mount = Mount.from_orm(mount)
     db.add(db_mount)
-    db.commit()
-    db.refresh(db_mount)
+    await db.flush()
     
-    # 处理品牌关联
+    # 处理品牌关联，与卡口在同一事务中提交
     if brand_ids:
         from models.brand_mount_link import BrandMountLink
         from models.brand import Brand
-        for brand_id in brand_ids:
-            # 确保brand_id有效且存在
-            brand_exists = db.exec(select(Brand).where(Brand.id == brand_id)).first()
-            if not brand_exists:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Brand with id {brand_id} not found"
-                )
-            brand_mount = BrandMountLink(brand_id=brand_id, mount_id=mount.id)
-            db.add(brand_mount)
-        db.commit()
+        await sync_links(
+            db, BrandMountLink.mount_id, BrandMountLink.brand_id,
+            db_mount.id, brand_ids, Brand.id, "品牌ID"
+        )
+    await db.commit()
+    await db.refresh(db_mount)
     
-    return mount
+    response_cache.invalidate("mount:list")
+    autocomplete_index.invalidate()
+    return db_mount
 
 @router.get(
     "/",
     response_model=List[MountRead],
     summary="获取卡口列表",
-    description="分页查询所有卡口信息",
+    description="分页查询所有卡口信息，支持fields参数只返回指定字段",
     response_description="卡口列表"
 )
 async def read_mounts(
+    request: Request,
+    response: Response,
     skip: Optional[int] = 0,
     limit: Optional[int] = 100,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # 查询卡口列表并关联品牌中文名称
-    mounts = db.exec(
-        select(Mount)
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, MountRead)
+    mounts = (await db.exec(
+        select_fields(Mount, MountRead, selected)
         .offset(skip)
         .limit(limit)
-    ).all()
-    
-    # 为每个卡口加载关联的品牌信息
-    for mount in mounts:
-        db.refresh(mount)
-        if mount.brands:
-            for brand in mount.brands:
-                db.refresh(brand)
-    
-    return mounts
+    )).all()
+    # 条件请求：列表未变化时返回304，跳过序列化
+    etag, last_modified = list_validators(mounts)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, List[fields_model(MountRead, selected)], mounts,
+        tags=["mount:list"], etag=etag, last_modified=last_modified
+    )
 
 @router.get(
     "/{mount_id}",
     response_model=MountRead,
     summary="获取卡口详情",
-    description="根据ID查询特定卡口信息",
+    description="根据ID查询特定卡口信息，支持fields参数只返回指定字段",
     response_description="卡口详细信息"
 )
-async def read_mount(mount_id: int, db: Session = Depends(get_db)):
-    mount = db.exec(
-        select(Mount).where(Mount.id == mount_id)
-    ).first()
+async def read_mount(
+    mount_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,name"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 读穿透缓存：命中时直接返回已序列化的JSON
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    
+    selected = parse_fields(fields, MountRead)
+    mount = (await db.exec(
+        select_fields(Mount, MountRead, selected).where(Mount.id == mount_id)
+    )).first()
     if not mount:
         raise HTTPException(status_code=404, detail="Mount not found")
-    
-    # 加载关联的品牌信息
-    db.refresh(mount)
-    if mount.brands:
-        for brand in mount.brands:
-            db.refresh(brand)
-    
-    return mount
+    etag, last_modified = item_validators(mount)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    return response_cache.store(
+        cache_key, response, fields_model(MountRead, selected), mount,
+        tags=[f"mount:{mount_id}"], etag=etag, last_modified=last_modified
+    )
 
 @router.put(
     "/{mount_id}",
@@ -118,7 +142,7 @@ async def update_mount(
     mount_id: int,
     mount_update: MountUpdate,
     brands: List[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     更新卡口信息
@@ -128,14 +152,14 @@ async def update_mount(
     :param db: 数据库会话
     :return: 更新后的卡口信息
     """
-    db_mount = db.get(Mount, mount_id)
+    db_mount = await db.get(Mount, mount_id)
     if not db_mount:
         raise HTTPException(status_code=404, detail="Mount not found")
     
     if mount_update.name != db_mount.name:
-        existing_mount = db.exec(
+        existing_mount = (await db.exec(
             select(Mount).where(Mount.name == mount_update.name)
-        ).first()
+        )).first()
         if existing_mount:
             raise HTTPException(
                 status_code=400,
@@ -154,23 +178,17 @@ async def update_mount(
         from models.brand_mount_link import BrandMountLink
         from models.brand import Brand
         
-        # 删除现有关联
-        db.exec(select(BrandMountLink).where(BrandMountLink.mount_id == mount_id)).delete()
-        
-        # 添加新关联
-        for brand_id in brands:
-            brand_exists = db.exec(select(Brand).where(Brand.id == brand_id)).first()
-            if not brand_exists:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Brand with id {brand_id} not found"
-                )
-            brand_mount = BrandMountLink(brand_id=brand_id, mount_id=mount_id)
-            db.add(brand_mount)
+        # 只增删有变化的关联行
+        await sync_links(
+            db, BrandMountLink.mount_id, BrandMountLink.brand_id,
+            mount_id, brands, Brand.id, "品牌ID"
+        )
     
     db.add(db_mount)
-    db.commit()
-    db.refresh(db_mount)
+    await db.commit()
+    await db.refresh(db_mount)
+    response_cache.invalidate(f"mount:{mount_id}", "mount:list")
+    autocomplete_index.invalidate()
     return db_mount
 
 @router.delete(
@@ -180,15 +198,17 @@ async def update_mount(
     response_description="删除操作结果",
     dependencies=[Depends(get_current_admin)]
 )
-async def delete_mount(mount_id: int, db: Session = Depends(get_db)):
-    mount = db.get(Mount, mount_id)
+async def delete_mount(mount_id: int, db: AsyncSession = Depends(get_async_db)):
+    mount = await db.get(Mount, mount_id)
     if not mount:
         raise HTTPException(status_code=404, detail="Mount not found")
     
     # 删除关联的品牌关系
     from models.brand_mount_link import BrandMountLink
-    db.exec(select(BrandMountLink).where(BrandMountLink.mount_id == mount_id)).delete()
+    await db.exec(delete(BrandMountLink).where(BrandMountLink.mount_id == mount_id))
     
-    db.delete(mount)
-    db.commit()
+    await db.delete(mount)
+    await db.commit()
+    response_cache.invalidate(f"mount:{mount_id}", "mount:list")
+    autocomplete_index.invalidate()
     return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,42 @@
+from enum import Enum
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request, Response
+
+from models.ranking import RankingRead
+from services.rankings import ranking_store
+from utils.http_cache import conditional_response
+
+router = APIRouter(prefix="/rankings", tags=["排行榜"])
+
+class RankingTarget(str, Enum):
+    camera = "camera"
+    lens = "lens"
+
+@router.get(
+    "/{target_type}",
+    response_model=RankingRead,
+    summary="评分排行榜",
+    description="按贝叶斯平均分降序返回相机或镜头排行榜，可按品牌、卡口筛选；数据来自定时刷新的内存快照",
+    response_description="排行榜条目及快照版本号"
+)
+async def read_ranking(
+    target_type: RankingTarget,
+    request: Request,
+    response: Response,
+    brand_id: Optional[int] = Query(None, description="按品牌ID筛选"),
+    mount_id: Optional[int] = Query(None, description="按卡口ID筛选"),
+    limit: int = Query(20, ge=1, le=100, description="返回条目数"),
+):
+    ranking = await ranking_store.get(target_type.value)
+    # 同一版本的快照内容不变，以版本号作为ETag
+    etag = f'W/"rank-{target_type.value}-{ranking.version}"'
+    not_modified = conditional_response(request, response, etag, ranking.refreshed_at)
+    if not_modified:
+        return not_modified
+    return RankingRead(
+        target_type=target_type.value,
+        version=ranking.version,
+        refreshed_at=ranking.refreshed_at,
+        items=ranking.filter(brand_id, mount_id)[:limit],
+    )
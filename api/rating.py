@@ -1,19 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlmodel import Session, select
 from typing import List, Optional
 
 from database.config import get_db
-from models.rating import Rating, RatingCreate, RatingRead, RatingUpdate
+from database.pagination import apply_id_cursor, set_next_cursor
+from models.rating import Rating, RatingCreate, RatingRead, RatingSummary, RatingUpdate
 from models.user import User
-from auth.auth import get_current_user
+from auth.auth import get_current_user, CurrentUser
+from services.ratings import RATING_TARGETS, apply_rating_delta, invalidate_rating_summary, rating_summaries
+from utils.response_cache import response_cache
 
 router = APIRouter(tags=["ratings"], prefix="/ratings")
 
+# 批量获取评分分布时单次允许的最大对象数
+SUMMARY_BATCH_MAX = 100
+
+def _invalidate_target(target_type: str, target_id: int):
+    # 评分聚合字段出现在相机/镜头的响应中，评分变化后失效对应缓存
+    invalidate_rating_summary(target_type, target_id)
+    if target_type in RATING_TARGETS:
+        response_cache.invalidate(f"{target_type}:{target_id}", f"{target_type}:list")
+
+def _check_target_type(target_type: str):
+    if target_type not in RATING_TARGETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的评分对象类型: {target_type}"
+        )
+
 @router.post("/", response_model=RatingRead, status_code=status.HTTP_201_CREATED)
 def create_rating(
     rating: RatingCreate,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     # 检查是否已存在相同用户对同一对象的评分
     existing_rating = session.exec(
@@ -33,19 +52,23 @@ def create_rating(
     db_rating = Rating.from_orm(rating)
     db_rating.user_id = current_user.id
     session.add(db_rating)
+    apply_rating_delta(session, db_rating.target_type, db_rating.target_id, db_rating.score, 1)
     session.commit()
     session.refresh(db_rating)
+    _invalidate_target(db_rating.target_type, db_rating.target_id)
     return db_rating
 
 @router.get("/", response_model=List[RatingRead])
 def read_ratings(
+    response: Response,
     target_type: Optional[str] = None,
     target_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标，传入后忽略skip"),
     session: Session = Depends(get_db)
 ):
-    query = select(Rating)
+    query = apply_id_cursor(select(Rating), Rating.id, cursor)
     
     # 筛选条件
     if target_type:
@@ -53,9 +76,38 @@ def read_ratings(
     if target_id:
         query = query.where(Rating.target_id == target_id)
     
-    ratings = session.exec(query.offset(skip).limit(limit)).all()
+    if not cursor:
+        query = query.offset(skip)
+    ratings = session.exec(query.limit(limit)).all()
+    set_next_cursor(response, ratings, limit)
     return ratings
 
+@router.get("/summary", response_model=RatingSummary)
+def read_rating_summary(
+    target_type: str = Query(..., description="评分对象类型: camera-相机, lens-镜头"),
+    target_id: int = Query(..., description="评分对象ID"),
+    session: Session = Depends(get_db)
+):
+    """评分对象的1-5星分布、平均分、中位数与人数"""
+    _check_target_type(target_type)
+    return rating_summaries(session, target_type, [target_id])[target_id]
+
+@router.get("/summary/batch", response_model=List[RatingSummary])
+def read_rating_summaries(
+    target_type: str = Query(..., description="评分对象类型: camera-相机, lens-镜头"),
+    target_ids: List[int] = Query(..., description="评分对象ID列表"),
+    session: Session = Depends(get_db)
+):
+    """批量获取多个对象的评分分布，未缓存的对象用一条分组查询一起计算"""
+    _check_target_type(target_type)
+    if len(target_ids) > SUMMARY_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多查询 {SUMMARY_BATCH_MAX} 个对象"
+        )
+    summaries = rating_summaries(session, target_type, target_ids)
+    return [summaries[target_id] for target_id in dict.fromkeys(target_ids)]
+
 @router.get("/{rating_id}", response_model=RatingRead)
 def read_rating(
     rating_id: int,
@@ -74,7 +126,7 @@ def update_rating(
     rating_id: int,
     rating_update: RatingUpdate,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     db_rating = session.get(Rating, rating_id)
     if not db_rating:
@@ -110,20 +162,32 @@ def update_rating(
             )
     
     # 更新评分
+    old_target = (db_rating.target_type, db_rating.target_id)
+    old_score = db_rating.score
     rating_data = rating_update.dict(exclude_unset=True)
     for key, value in rating_data.items():
         setattr(db_rating, key, value)
     
+    # 同步评分对象的聚合字段：对象变化时从旧对象移除、计入新对象，否则只调整分差
+    new_target = (db_rating.target_type, db_rating.target_id)
+    if new_target != old_target:
+        apply_rating_delta(session, *old_target, -old_score, -1)
+        apply_rating_delta(session, *new_target, db_rating.score, 1)
+    else:
+        apply_rating_delta(session, *new_target, db_rating.score - old_score, 0)
+    
     session.add(db_rating)
     session.commit()
     session.refresh(db_rating)
+    _invalidate_target(*old_target)
+    _invalidate_target(*new_target)
     return db_rating
 
 @router.delete("/{rating_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_rating(
     rating_id: int,
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     rating = session.get(Rating, rating_id)
     if not rating:
@@ -140,5 +204,7 @@ def delete_rating(
         )
     
     session.delete(rating)
+    apply_rating_delta(session, rating.target_type, rating.target_id, -rating.score, -1)
     session.commit()
+    _invalidate_target(rating.target_type, rating.target_id)
     return None
\ No newline at end of file
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from datetime import timedelta
 import os
 
 from models.user import User, UserCreate, UserRead, UserUpdate
-from database.config import get_db
-from auth.auth import get_current_user, get_current_admin, get_password_hash, login_user
+from database.config import get_async_db
+from auth.auth import get_current_user, get_current_admin, aget_password_hash, login_user, CurrentUser, invalidate_user_cache
 
 router = APIRouter(prefix="/users", tags=["用户管理"])
 
@@ -16,10 +17,10 @@ router = APIRouter(prefix="/users", tags=["用户管理"])
     description="用户登录接口，返回访问令牌",
     response_description="访问令牌"
 )
-async def login(user: UserCreate, db: Session = Depends(get_db)):
+async def login(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     username = user.username
     password = user.password
-    access_token = login_user(db, username, password)
+    access_token = await login_user(db, username, password)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post(
@@ -29,14 +30,14 @@ async def login(user: UserCreate, db: Session = Depends(get_db)):
     description="新用户注册接口",
     response_description="注册成功的用户信息"
 )
-async def register_user(user_data: dict, db: Session = Depends(get_db)):
+async def register_user(user_data: dict, db: AsyncSession = Depends(get_async_db)):
     # 检查用户名和邮箱是否已存在
-    existing_user = db.exec(
+    existing_user = (await db.exec(
         select(User).where(
             (User.username == user_data.get("username")) | 
             (User.email == user_data.get("email"))
         )
-    ).first()
+    )).first()
     if existing_user:
         raise HTTPException(
             status_code=400,
@@ -44,13 +45,13 @@ async def register_user(user_data: dict, db: Session = Depends(get_db)):
         )
     
     db_user = User(
-        username=user.username,
-        email=user.email,
-        password_hash=get_password_hash(user.password)
+        username=user_data.get("username"),
+        email=user_data.get("email"),
+        password_hash=await aget_password_hash(user_data.get("password"))
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post(
@@ -61,26 +62,26 @@ async def register_user(user_data: dict, db: Session = Depends(get_db)):
     response_description="创建成功的用户信息",
     dependencies=[Depends(get_current_admin)]
 )
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # 检查用户名和邮箱是否已存在
-    existing_user = db.exec(
+    existing_user = (await db.exec(
         select(User).where(
             (User.username == user.username) | 
             (User.email == user.email)
         )
-    ).first()
+    )).first()
     if existing_user:
         raise HTTPException(
             status_code=400,
             detail="Username or email already exists"
         )
     
-    user.password_hash = get_password_hash(user.password)
+    user.password_hash = await aget_password_hash(user.password)
     db_user = User.from_orm(user)
     db.add(db_user)
-    db.commit()
-    db.refresh(user)
-    return user
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
 
 @router.get(
     "/",
@@ -92,12 +93,12 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
 async def read_users(
     skip: Optional[int] = 0,
     limit: Optional[int] = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_admin)
 ):
-    users = db.exec(
+    users = (await db.exec(
         select(User).offset(skip).limit(limit)
-    ).all()
+    )).all()
     return users
 
 @router.get(
@@ -108,9 +109,14 @@ async def read_users(
     response_description="当前用户信息"
 )
 async def read_current_user(
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return current_user
+    # 认证依赖只返回用户快照，完整信息按ID读取
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    return user
 
 @router.get(
     "/{user_id}",
@@ -121,12 +127,12 @@ async def read_current_user(
 )
 async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    user = db.exec(
+    user = (await db.exec(
         select(User).where(User.id == user_id)
-    ).first()
+    )).first()
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     if not current_user.is_staff and user_id != current_user.id:
@@ -143,10 +149,10 @@ async def read_user(
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    db_user = db.get(User, user_id)
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     if current_user.role != 'admin' and user_id != current_user.id:
@@ -155,12 +161,12 @@ async def update_user(
     # 检查更新后的用户名和邮箱是否与其他用户冲突
     if (user_update.username != db_user.username or 
         user_update.email != db_user.email):
-        existing_user = db.exec(
+        existing_user = (await db.exec(
             select(User).where(
                 (User.username == user_update.username) | 
                 (User.email == user_update.email)
             )
-        ).first()
+        )).first()
         if existing_user and existing_user.id != user_id:
             raise HTTPException(
                 status_code=400,
@@ -170,14 +176,15 @@ async def update_user(
     user_data = user_update.model_dump(exclude_unset=True)
     # 处理密码哈希
     if 'password' in user_data:
-        user_data['password_hash'] = get_password_hash(user_data.pop('password'))
+        user_data['password_hash'] = await aget_password_hash(user_data.pop('password'))
     
     for key, value in user_data.items():
         setattr(db_user, key, value)
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_user_cache(user_id)
     return db_user
 
 @router.delete(
@@ -188,13 +195,14 @@ async def update_user(
 )
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_admin)
 ):
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    invalidate_user_cache(user_id)
     return {"ok": True}
\ No newline at end of file
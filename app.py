@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -11,21 +12,43 @@ from api.comment import router as comment_router
 from api.tag import router as tag_router
 from api.rating import router as rating_router
 from api.category import router as category_router
+from api.metrics import router as metrics_router
+from api.ranking import router as ranking_router
+from api.export import router as export_router
+from api.autocomplete import router as autocomplete_router
+from middleware.db_stats import db_stats_middleware
+from middleware.metrics import metrics_middleware
+from services.counters import article_counters
+from services.rankings import ranking_store
+from services.compatibility import compatibility_index
+from services.autocomplete import autocomplete_index
 from alembic.config import Config
 from alembic import command
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     # 应用启动时执行数据库迁移
-#     alembic_cfg = Config("alembic.ini")
-#     command.upgrade(alembic_cfg, "head")
-#     yield
-    # 应用关闭时可以添加清理逻辑
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 应用启动时执行数据库迁移
+    # alembic_cfg = Config("alembic.ini")
+    # command.upgrade(alembic_cfg, "head")
+    # 启动后台定时任务：排行榜刷新、文章计数写回、兼容性索引重建、自动补全索引刷新
+    background_tasks = [
+        asyncio.create_task(ranking_store.run_periodic_refresh()),
+        asyncio.create_task(article_counters.run_periodic_flush()),
+        asyncio.create_task(compatibility_index.run_periodic_rebuild()),
+        asyncio.create_task(autocomplete_index.run_periodic_refresh()),
+    ]
+    yield
+    # 应用关闭时取消后台任务，并把缓冲中的计数写回数据库
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await article_counters.flush()
 
 app = FastAPI(
     title="相机数据管理系统API",
     description="相机数据管理后端服务，提供信息的增删改查功能",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
 # 添加CORS中间件
@@ -35,8 +58,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-DB-Time-ms", "ETag", "Last-Modified"],
 )
 
+# 按请求统计SQL语句数与耗时，检测N+1查询
+app.middleware("http")(db_stats_middleware)
+# 记录请求计数与按路由模板统计的耗时直方图，由 /metrics 输出
+app.middleware("http")(metrics_middleware)
+
 app.include_router(brand_router)
 app.include_router(user_router)
 app.include_router(camera_router)
@@ -47,6 +76,10 @@ app.include_router(comment_router)
 app.include_router(tag_router)
 app.include_router(rating_router)
 app.include_router(category_router)
+app.include_router(metrics_router)
+app.include_router(export_router)
+app.include_router(ranking_router)
+app.include_router(autocomplete_router)
 
 
 
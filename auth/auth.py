@@ -1,14 +1,20 @@
 import os
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from dotenv import load_dotenv
 from models.user import User
-from database.config import get_db
+from database.config import get_async_db
+from utils.cache import TTLCache
 from datetime import datetime, timedelta, timezone  # 添加timezone导入
 
 # 加载环境变量
@@ -25,15 +31,77 @@ if not SECRET_KEY:
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """认证后的用户快照，只包含权限判断所需的字段，可安全地跨请求缓存"""
+    id: int
+    username: str
+    is_active: bool
+    is_staff: bool
+
+    @property
+    def role(self) -> str:
+        return "admin" if self.is_staff else "user"
+
+    @property
+    def is_admin(self) -> bool:
+        return self.is_staff
+
+# 令牌 -> 用户快照缓存，避免每个认证请求都查询一次用户表
+USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+user_cache = TTLCache(maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")), ttl=USER_CACHE_TTL)
+
+def invalidate_user_cache(user_id: int):
+    """用户信息被修改或删除时，清除该用户所有令牌对应的缓存"""
+    user_cache.pop_where(lambda token, snapshot: snapshot.id == user_id)
+
 def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.exec(select(User).where(User.username == username)).first()
-    if not user or not verify_password(password, user.password_hash):
+# bcrypt单次计算耗时100~300ms，放到独立的有界执行器中运行，避免阻塞事件循环
+# thread：bcrypt计算时释放GIL，线程池即可并行；process：完全隔离CPU开销
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# 排队+执行中的哈希任务上限，超过时直接返回503，而不是无限堆积
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+if PASSWORD_HASH_EXECUTOR == "process":
+    password_executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+else:
+    password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+# 当前排队+执行中的哈希任务数（只在事件循环线程中修改）
+password_pending = 0
+
+async def _run_password_task(func, *args):
+    global password_pending
+    if password_pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+    password_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        password_pending -= 1
+
+async def averify_password(plain_password: str, hashed_password: str):
+    """在密码执行器中校验密码"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str):
+    """在密码执行器中计算密码哈希"""
+    return await _run_password_task(get_password_hash, password)
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = (await db.exec(select(User).where(User.username == username))).first()
+    if not user or not await averify_password(password, user.password_hash):
         return None
     return user
 
@@ -49,7 +117,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,13 +132,27 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.exec(select(User).where(User.username == username)).first()
+    cached = user_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    user = (await db.exec(select(User).where(User.username == username))).first()
     if user is None:
         raise credentials_exception
-    return user
+    snapshot = CurrentUser(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        is_staff=user.is_staff
+    )
+    # 缓存时间不超过令牌剩余有效期
+    ttl = min(USER_CACHE_TTL, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        user_cache.set(token, snapshot, ttl=ttl)
+    return snapshot
 
-def login_user(db: Session, username: str, password: str):
-    user = authenticate_user(db, username, password)
+async def login_user(db: AsyncSession, username: str, password: str):
+    user = await authenticate_user(db, username, password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,7 +166,7 @@ def login_user(db: Session, username: str, password: str):
     return access_token
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(
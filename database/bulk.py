@@ -0,0 +1,47 @@
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from fastapi import HTTPException
+from sqlmodel import SQLModel, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.bulk import BulkRowError
+
+# 单次批量导入允许的最大行数
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "10000"))
+
+def check_bulk_size(items: Sequence[Any]):
+    """校验批量导入的行数，空数组或超过上限时直接拒绝"""
+    if not items:
+        raise HTTPException(status_code=400, detail="导入数据不能为空")
+    if len(items) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"单次最多导入 {BULK_IMPORT_MAX_ROWS} 条数据"
+        )
+
+async def existing_values(db: AsyncSession, column, values: Iterable[Any]) -> Set[Any]:
+    """用一条 SELECT ... WHERE column IN (...) 查出已存在的值，代替逐行查询"""
+    values = {value for value in values if value is not None}
+    if not values:
+        return set()
+    return set((await db.exec(select(column).where(column.in_(values)))).all())
+
+async def existing_keys(db: AsyncSession, column, values: Iterable[Optional[str]]) -> Set[str]:
+    """
+    字符串列的已存在值，统一casefold后返回：MySQL默认排序规则不区分大小写，
+    IN查询会命中仅大小写不同的行，调用方也应以casefold后的值比较
+    """
+    return {value.casefold() for value in await existing_values(db, column, values)}
+
+def bulk_conflict(errors: List[BulkRowError]) -> HTTPException:
+    """提交时违反数据库约束（校验后数据被并发修改）的409响应，逐行列出按最新数据重新校验后冲突的行"""
+    return HTTPException(
+        status_code=409,
+        detail=[error.model_dump() for error in errors] or "导入数据与现有数据冲突，请重试"
+    )
+
+async def insert_many(db: AsyncSession, model: type[SQLModel], rows: List[Dict[str, Any]]):
+    """以 executemany 方式批量插入，不经过ORM逐个对象的flush"""
+    if rows:
+        await db.exec(insert(model), params=rows)
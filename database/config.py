@@ -1,7 +1,11 @@
 import os
 from dotenv import load_dotenv
 from sqlmodel import create_engine,Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from database.query_stats import install_query_stats
 
 load_dotenv()
 
@@ -9,6 +13,17 @@ DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URI")
 if not DATABASE_URL:
     raise ValueError("Missing SQLALCHEMY_DATABASE_URI in environment variables")
 
+def _build_async_url(url: str) -> str:
+    """
+    由同步连接串推导异步连接串：保留方言(mysql/mariadb)，驱动替换为aiomysql
+    例如 mariadb+mariadbconnector://... -> mariadb+aiomysql://...
+    """
+    sync_url = make_url(url)
+    return sync_url.set(drivername=f"{sync_url.get_backend_name()}+aiomysql").render_as_string(hide_password=False)
+
+# 异步连接串，未单独配置时由同步连接串推导
+ASYNC_DATABASE_URL = os.getenv("SQLALCHEMY_ASYNC_DATABASE_URI") or _build_async_url(DATABASE_URL)
+
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
@@ -18,11 +33,37 @@ engine = create_engine(
     connect_args={"connect_timeout": 5}  # 新增关键参数
 )
 
+# 异步引擎：基于aiomysql，数据库往返期间不会阻塞事件循环
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=int(os.getenv("DB_ASYNC_POOL_SIZE", "20")),       # 单个worker可并发的连接数
+    max_overflow=int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "30")),
+    pool_recycle=3600,
+    connect_args={"connect_timeout": 5}
+)
+
+# 注册SQL执行统计事件，用于按请求统计语句数与耗时
+install_query_stats(engine, async_engine.sync_engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine,class_=Session)
 
+# expire_on_commit=False：提交后对象属性仍可直接读取，避免异步环境下触发隐式懒加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 def get_db() -> Session:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncSession:
+    """异步数据库会话依赖，供async路由使用"""
+    async with AsyncSessionLocal() as db:
+        yield db
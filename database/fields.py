@@ -0,0 +1,49 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import ConfigDict, create_model
+from sqlalchemy.orm import load_only
+from sqlmodel import SQLModel, select
+
+from database.loaders import with_loaders
+
+# ETag / Last-Modified 与游标由 id、updated_at 计算，无论请求哪些字段都要查询
+_ALWAYS_LOADED = ("id", "updated_at")
+
+def parse_fields(fields: Optional[str], read_model: Type[SQLModel]) -> Optional[Tuple[str, ...]]:
+    """
+    解析稀疏字段参数（如 fields=id,name,brand_id），字段须属于响应模型，否则返回400
+    结果按响应模型的字段顺序规范化，未指定时返回None表示返回完整模型
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - read_model.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知字段: {', '.join(sorted(unknown))}")
+    return tuple(name for name in read_model.model_fields if name in requested) or None
+
+@lru_cache(maxsize=256)
+def _sparse_model(read_model: Type[SQLModel], fields: Tuple[str, ...]):
+    # 同一字段集合只构造一次模型，其序列化器也随之复用
+    return create_model(
+        f"{read_model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True, arbitrary_types_allowed=True),
+        **{name: (read_model.model_fields[name].annotation, read_model.model_fields[name]) for name in fields},
+    )
+
+def fields_model(read_model: Type[SQLModel], fields: Optional[Tuple[str, ...]]):
+    """请求了字段子集时返回裁剪后的响应模型，否则返回原响应模型"""
+    return _sparse_model(read_model, fields) if fields else read_model
+
+def select_fields(model: Type[SQLModel], read_model: Type[SQLModel], fields: Optional[Tuple[str, ...]]):
+    """
+    构造查询：未指定字段时按响应模型的预加载策略查询完整行；
+    指定字段时只SELECT这些列，裁剪后的模型不含关联对象，也不再预加载关系
+    """
+    query = select(model)
+    if not fields:
+        return with_loaders(query, read_model)
+    columns = dict.fromkeys(_ALWAYS_LOADED + fields)
+    return query.options(load_only(*(getattr(model, name) for name in columns)))
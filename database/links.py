@@ -0,0 +1,39 @@
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.bulk import existing_values, insert_many
+
+async def sync_links(
+    db: AsyncSession,
+    owner_column,
+    target_column,
+    owner_id: int,
+    target_ids: Iterable[int],
+    target_pk,
+    target_label: str,
+):
+    """
+    按集合差异同步多对多关联行，只增删发生变化的部分
+    例如 sync_links(db, LensMountLink.lens_id, LensMountLink.mount_id, lens_id, mount_ids, Mount.id, "卡口ID")
+    目标ID用一条IN查询校验是否存在，现有关联查询一次，删除与插入各一条语句
+    """
+    link_model = owner_column.class_
+    wanted = set(target_ids)
+    missing = sorted(wanted - await existing_values(db, target_pk, wanted))
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{target_label} {', '.join(map(str, missing))} 不存在"
+        )
+    
+    current = set((await db.exec(select(target_column).where(owner_column == owner_id))).all())
+    stale = current - wanted
+    if stale:
+        await db.exec(delete(link_model).where(owner_column == owner_id, target_column.in_(stale)))
+    await insert_many(db, link_model, [
+        link_model(**{owner_column.key: owner_id, target_column.key: target_id}).model_dump()
+        for target_id in sorted(wanted - current)
+    ])
@@ -0,0 +1,19 @@
+from typing import Dict, Tuple, Type
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import SQLModel
+
+# 按响应模型声明的预加载策略：响应模型 -> (数据库模型, 需要预加载的关系名)
+# 每个关系用一条 SELECT ... WHERE id IN (...) 批量加载，查询数与行数无关。
+# 目前卡口、品牌、镜头的响应模型只包含列字段、不嵌套关联对象，因此无需预加载；
+# 为响应模型增加嵌套字段时在此登记对应关系，避免序列化时逐行懒加载，
+# 并在被嵌套实体的写接口中一并失效该响应的缓存标签
+LOADER_POLICY: Dict[Type[SQLModel], Tuple[Type[SQLModel], Tuple[str, ...]]] = {}
+
+def with_loaders(query, read_model: Type[SQLModel]):
+    """为查询附加响应模型对应的预加载选项，未登记的模型原样返回"""
+    policy = LOADER_POLICY.get(read_model)
+    if not policy:
+        return query
+    model, relations = policy
+    return query.options(*(selectinload(getattr(model, name)) for name in relations))
@@ -0,0 +1,87 @@
+import base64
+import json
+from datetime import datetime as dt
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+# 游标翻页时下一页游标通过该响应头返回，保持列表响应体结构不变
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values: Any) -> str:
+    """将最后一行的排序键编码为不透明游标（URL安全的base64）"""
+    payload = [v.isoformat() if isinstance(v, dt) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """解析游标，格式不正确时返回400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    return values
+
+def apply_id_cursor(query, id_column, cursor: Optional[str]):
+    """
+    按主键升序的键集分页：有游标时转换为 WHERE id > :last 的索引定位，
+    避免 OFFSET 扫描并丢弃前面所有行
+    """
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        query = query.where(id_column > last_id)
+    return query.order_by(id_column)
+
+def apply_published_cursor(query, published_column, id_column, cursor: Optional[str]):
+    """
+    按 (published_at DESC, id DESC) 排序的键集分页，用于文章列表
+    published_at 为空的行排在最后（与MariaDB降序时NULL排序一致）
+    """
+    if cursor:
+        last_published, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        if last_published is None:
+            query = query.where(and_(published_column.is_(None), id_column < last_id))
+        else:
+            try:
+                last_published = dt.fromisoformat(last_published)
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail="无效的分页游标")
+            query = query.where(or_(
+                published_column < last_published,
+                and_(published_column == last_published, id_column < last_id),
+                published_column.is_(None),
+            ))
+    return query.order_by(published_column.desc(), id_column.desc())
+
+def apply_count_cursor(query, count_column, id_column, cursor: Optional[str]):
+    """
+    按 (计数 DESC, id DESC) 排序的键集分页，用于"最多讨论"等按计数排行的列表
+    计数列不为空，游标为上一页最后一行的 (计数, id)
+    """
+    if cursor:
+        last_count, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_count, int) or not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        query = query.where(or_(
+            count_column < last_count,
+            and_(count_column == last_count, id_column < last_id),
+        ))
+    return query.order_by(count_column.desc(), id_column.desc())
+
+def set_next_cursor(
+    response: Response,
+    rows: Sequence[Any],
+    limit: Optional[int],
+    key: Callable[[Any], tuple] = lambda row: (row.id,),
+):
+    """当本页已满时，根据最后一行生成下一页游标写入响应头"""
+    if rows and limit and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
@@ -0,0 +1,76 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 折叠 IN (?, ?, ...) / VALUES (...), (...) 等随参数个数变化的部分，得到语句"形状"
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+class QueryStats:
+    """单个请求内的SQL统计：语句数、总耗时以及各语句形状的执行次数"""
+
+    __slots__ = ("count", "total_time", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    @property
+    def total_time_ms(self) -> float:
+        return self.total_time * 1000
+
+    def repeated(self, threshold: int):
+        """返回执行次数超过阈值的语句形状，按次数降序"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+# 当前请求的统计对象；请求之外（脚本、后台任务）为None，不做统计
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def statement_shape(statement: str) -> str:
+    """将SQL归一化为模板，用于识别同一形状的重复执行（N+1）"""
+    shape = _SPACE_RE.sub(" ", statement).strip()
+    shape = _IN_LIST_RE.sub("IN (...)", shape)
+    return _VALUES_RE.sub(r"VALUES \1, ...", shape)
+
+def start_request_stats() -> QueryStats:
+    """为当前请求开启统计，返回统计对象"""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+def current_request_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.total_time += time.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.shapes[statement_shape(statement)] += 1
+
+def _handle_error(exception_context):
+    # 语句执行失败时不会触发after_cursor_execute，丢弃对应的起始时间
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+def install_query_stats(*engines: Engine):
+    """在同步引擎上注册游标执行事件（异步引擎传入其 sync_engine）"""
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
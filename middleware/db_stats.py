@@ -0,0 +1,29 @@
+import logging
+import os
+
+from fastapi import Request
+
+from database.query_stats import start_request_stats
+
+logger = logging.getLogger(__name__)
+
+# 调试模式下通过响应头暴露每个请求的SQL统计
+DEBUG = os.getenv("APP_DEBUG", "false").lower() in ("1", "true", "yes")
+# 同一形状的语句在单个请求内执行超过该次数时记录N+1告警
+REPEAT_THRESHOLD = int(os.getenv("DB_QUERY_REPEAT_THRESHOLD", "10"))
+
+async def db_stats_middleware(request: Request, call_next):
+    """统计请求期间执行的SQL语句数与耗时，并检测疑似N+1查询"""
+    stats = start_request_stats()
+    response = await call_next(request)
+
+    for shape, count in stats.repeated(REPEAT_THRESHOLD):
+        logger.warning(
+            "疑似N+1查询：%s %s 中同一语句执行了 %d 次：%s",
+            request.method, request.url.path, count, shape
+        )
+
+    if DEBUG:
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time-ms"] = f"{stats.total_time_ms:.2f}"
+    return response
@@ -0,0 +1,122 @@
+import bisect
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from fastapi import Request
+
+# 请求耗时直方图的桶边界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 指标样本：(指标名, 标签, 值)
+Sample = Tuple[str, Dict[str, str], float]
+# 指标采集器：返回 (指标名, 帮助信息, 类型, 样本列表)，用于在抓取时即时计算的gauge
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+class _Histogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.sum += value
+        self.count += 1
+
+# 请求计数：(method, route, status) -> 次数
+_request_counts: Dict[Tuple[str, str, str], int] = defaultdict(int)
+# 请求耗时：(method, route) -> 直方图
+_request_latency: Dict[Tuple[str, str], _Histogram] = defaultdict(_Histogram)
+_collectors: List[Collector] = []
+
+def register_collector(collector: Collector):
+    """注册抓取时执行的指标采集器（如连接池、缓存命中率）"""
+    _collectors.append(collector)
+
+def register_cache(name: str, cache):
+    """登记一个带 hits/misses 计数的缓存，抓取时输出其命中、未命中次数、命中率与条目数"""
+    def collect():
+        labels = {"cache": name}
+        return [
+            ("cache_hits_total", "缓存命中次数", "counter", [("cache_hits_total", labels, cache.hits)]),
+            ("cache_misses_total", "缓存未命中次数", "counter", [("cache_misses_total", labels, cache.misses)]),
+            ("cache_entries", "缓存条目数", "gauge", [("cache_entries", labels, len(cache))]),
+            ("cache_hit_ratio", "缓存命中率", "gauge", [("cache_hit_ratio", labels, cache.hit_ratio)]),
+        ]
+    register_collector(collect)
+
+def _route_template(request: Request) -> str:
+    # 使用路由模板(/cameras/{camera_id})而非原始路径作为标签，避免标签基数膨胀
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+async def metrics_middleware(request: Request, call_next):
+    """记录每个请求的次数、状态码与耗时"""
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        route = _route_template(request)
+        _request_counts[(request.method, route, status)] += 1
+        _request_latency[(request.method, route)].observe(elapsed)
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_metrics() -> str:
+    """以Prometheus文本格式输出全部指标"""
+    lines = [
+        "# HELP http_requests_total 请求总数",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(_request_counts.items()):
+        labels = {"method": method, "route": route, "status": status}
+        lines.append(f"http_requests_total{_format_labels(labels)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds 请求耗时（秒）",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), hist in sorted(_request_latency.items()):
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS, hist.buckets):
+            cumulative += n
+            labels = {"method": method, "route": route, "le": _format_value(bound)}
+            lines.append(f"http_request_duration_seconds_bucket{_format_labels(labels)} {cumulative}")
+        labels = {"method": method, "route": route}
+        inf_labels = dict(labels, le="+Inf")
+        lines.append(f"http_request_duration_seconds_bucket{_format_labels(inf_labels)} {hist.count}")
+        lines.append(f"http_request_duration_seconds_sum{_format_labels(labels)} {_format_value(hist.sum)}")
+        lines.append(f"http_request_duration_seconds_count{_format_labels(labels)} {hist.count}")
+
+    # 同名指标族（如多个缓存的 cache_hits_total）合并输出，HELP/TYPE 只出现一次
+    families: Dict[str, Tuple[str, str, List[Sample]]] = {}
+    for collector in _collectors:
+        for name, help_text, metric_type, samples in collector():
+            families.setdefault(name, (help_text, metric_type, []))[2].extend(samples)
+    for name, (help_text, metric_type, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -22,6 +22,9 @@ class ArticleBase(SQLModel):
     published_at: Optional[dt] = Field(default=None, description="发布时间")
 
 class Article(ArticleBase, BaseSQLModel, table=True):
+    # 按评论数排序的"最多讨论"列表使用
+    __table_args__ = (sa.Index("ix_article_comment_count_id", "comment_count", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     author_id: int = Field(foreign_key="user.id", description="作者ID")
     # 关系定义
@@ -51,4 +54,20 @@ class ArticleUpdate(ArticleBase):
 class ArticleRead(ArticleBase):
     id: int
     created_at: Optional[dt] = None
-    updated_at: Optional[dt] = None
\ No newline at end of file
+    updated_at: Optional[dt] = None
+
+# 列表摘要模型：不含正文content，列表接口只查询这些列
+class ArticleSummary(SQLModel):
+    id: int
+    title: str = Field(description="文章标题")
+    title_zh: Optional[str] = Field(default=None, description="文章中文标题")
+    slug: str = Field(description="URL友好的标题")
+    excerpt: Optional[str] = Field(default=None, description="文章摘要")
+    category_id: int = Field(description="分类ID")
+    status: str = Field(description="文章状态")
+    view_count: int = Field(default=0, description="阅读量")
+    like_count: int = Field(default=0, description="点赞数")
+    comment_count: int = Field(default=0, description="评论数")
+    published_at: Optional[dt] = Field(default=None, description="发布时间")
+    created_at: Optional[dt] = None
+    updated_at: Optional[dt] = None
@@ -0,0 +1,13 @@
+from typing import List
+from sqlmodel import SQLModel, Field
+
+class BulkRowError(SQLModel):
+    """批量导入中单行的错误信息"""
+    index: int = Field(description="出错行在请求数组中的下标（从0开始）")
+    detail: str = Field(description="错误原因")
+
+class BulkImportResult(SQLModel):
+    """批量导入结果：合法行全部写入，不合法的行跳过并逐行返回错误"""
+    created: int = Field(description="成功导入的行数")
+    failed: int = Field(description="未导入的行数")
+    errors: List[BulkRowError] = Field(default_factory=list, description="逐行错误信息")
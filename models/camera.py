@@ -1,5 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
+from decimal import Decimal
 from datetime import datetime as dt
 import sqlalchemy as sa
 from .base import BaseSQLModel
@@ -28,6 +29,12 @@ class CameraBase(SQLModel):
 # 数据库模型 - 继承基础模型和BaseSQLModel
 class Camera(CameraBase, BaseSQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    # 评分聚合字段：由评分接口以SQL增量方式维护，不接受客户端写入
+    rating: Optional[Decimal] = Field(default=None, max_digits=2, decimal_places=1, description="评分")
+    rating_count: int = Field(default=0, description="评分人数")
+    rating_sum: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2, description="评分总和")
+    # 规范化的型号代码（见utils.model_codes），创建/更新时计算，供型号查找精确匹配
+    model_code_key: Optional[str] = Field(sa_column=sa.Column(sa.String(50), index=True), default=None, description="规范化型号代码")
     # 关系定义
     brand: Brand = Relationship(back_populates="cameras")
     ratings: List["Rating"] = Relationship(back_populates="camera")
@@ -59,6 +66,8 @@ class CameraUpdate(SQLModel):
 # 数据读取模型 - 继承基础模型并添加ID和时间戳字段
 class CameraRead(CameraBase):
     id: int
+    rating: Optional[Decimal] = None
+    rating_count: int = 0
     created_at: dt
     updated_at: dt
     
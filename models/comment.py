@@ -52,4 +52,11 @@ class CommentRead(CommentBase):
     """用于读取评论的模型，包含ID和审核状态"""
     id: int
     author_id: int
-    is_approved: bool
\ No newline at end of file
+    is_approved: bool
+
+class CommentTreeNode(CommentRead):
+    """评论树节点，replies 为按ID升序排列的直接回复"""
+    depth: int = Field(default=0, description="所在层级，根评论为0")
+    replies: List["CommentTreeNode"] = Field(default_factory=list, description="直接回复")
+
+CommentTreeNode.model_rebuild()
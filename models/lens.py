@@ -13,10 +13,6 @@ class LensBase(SQLModel):
     model: str = Field(sa_column=sa.Column(sa.String(100)), description="镜头型号")
     model_zh: Optional[str] = Field(sa_column=sa.Column(sa.String(100)), default=None, description="镜头中文型号")
     brand_id: Optional[int] = Field(default=None, foreign_key="brand.id", description="品牌ID")
-    # 添加评分字段：0-5分，精确到小数点后一位
-    rating: Optional[Decimal] = Field(default=None, ge=Decimal('0.0'), le=Decimal('5.0'), max_digits=2, decimal_places=1, description="评分")
-    # 添加评分人数字段：非负整数
-    rating_count: int = Field(default=0, ge=0, description="评分人数")
     focal_length: Optional[str] = Field(sa_column=sa.Column(sa.String(50)), default=None, description="焦距范围")
     aperture_range: Optional[str] = Field(sa_column=sa.Column(sa.String(50)), default=None, description="光圈范围")
     lens_type: Optional[str] = Field(sa_column=sa.Column(sa.String(50)), default=None, description="镜头类型")
@@ -28,7 +24,22 @@ class LensBase(SQLModel):
 
 class Lens(LensBase, BaseSQLModel, table=True):
     """镜头数据库模型，映射到数据库表"""
+    # 按焦段覆盖、最大光圈筛选时走索引范围扫描
+    __table_args__ = (
+        sa.Index("ix_lens_focal_range", "focal_min_mm", "focal_max_mm"),
+        sa.Index("ix_lens_aperture_min", "aperture_min"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    # 由focal_length、aperture_range文本解析出的数值规格，创建/更新时由utils.lens_specs计算，不接受直接写入
+    focal_min_mm: Optional[float] = Field(default=None, description="最短焦距(mm)")
+    focal_max_mm: Optional[float] = Field(default=None, description="最长焦距(mm)")
+    aperture_min: Optional[float] = Field(default=None, description="最小f值（最大光圈）")
+    aperture_max: Optional[float] = Field(default=None, description="最大f值（长焦端最大光圈）")
+    # 评分聚合字段：由评分接口以SQL增量方式维护，不接受客户端写入，rating = rating_sum / rating_count
+    rating: Optional[Decimal] = Field(default=None, max_digits=2, decimal_places=1, description="评分")
+    rating_count: int = Field(default=0, description="评分人数")
+    rating_sum: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2, description="评分总和")
     # 关系定义
     brand: Brand = Relationship(back_populates="lenses")
     mounts: List[Mount] = Relationship(back_populates="lenses", link_model=LensMountLink)
@@ -38,9 +49,19 @@ class LensCreate(LensBase):
     """镜头创建模型，用于API创建请求"""
     pass
 
+class LensBulkItem(LensCreate):
+    """镜头批量导入的单行数据，附带需要关联的卡口ID"""
+    mount_ids: List[int] = Field(default_factory=list, description="关联的卡口ID列表")
+
 class LensRead(LensBase):
     """镜头读取模型，用于API响应"""
     id: int
+    rating: Optional[Decimal] = None
+    rating_count: int = 0
+    focal_min_mm: Optional[float] = None
+    focal_max_mm: Optional[float] = None
+    aperture_min: Optional[float] = None
+    aperture_max: Optional[float] = None
     created_at: Optional[dt] = None
     updated_at: Optional[dt] = None
 
@@ -52,8 +73,6 @@ class LensUpdate(SQLModel):
     model: Optional[str] = Field(sa_column=sa.Column(sa.String(100)), default=None, description="镜头型号")
     model_zh: Optional[str] = Field(sa_column=sa.Column(sa.String(100)), default=None, description="镜头中文型号")
     brand_id: Optional[int] = Field(default=None, foreign_key="brand.id", description="品牌ID")
-    rating: Optional[Decimal] = Field(default=None, ge=Decimal('0.0'), le=Decimal('5.0'), max_digits=2, decimal_places=1, description="评分")
-    rating_count: Optional[int] = Field(default=None, ge=0, description="评分人数")
     focal_length: Optional[str] = Field(sa_column=sa.Column(sa.String(50)), default=None, description="焦距范围")
     aperture_range: Optional[str] = Field(sa_column=sa.Column(sa.String(50)), default=None, description="光圈范围")
     lens_type: Optional[str] = Field(sa_column=sa.Column(sa.String(50)), default=None, description="镜头类型")
@@ -0,0 +1,20 @@
+from typing import List, Optional
+from datetime import datetime as dt
+from sqlmodel import SQLModel, Field
+
+class RankingEntry(SQLModel):
+    """排行榜中的一项"""
+    id: int = Field(description="相机/镜头ID")
+    name: str = Field(description="相机名称或镜头型号")
+    brand_id: Optional[int] = Field(default=None, description="品牌ID")
+    mount_ids: List[int] = Field(default_factory=list, description="卡口ID列表")
+    rating_count: int = Field(description="评分人数")
+    average: float = Field(description="算术平均分")
+    score: float = Field(description="贝叶斯平均分，用于排序")
+
+class RankingRead(SQLModel):
+    """排行榜响应"""
+    target_type: str = Field(description="排行对象类型: camera-相机, lens-镜头")
+    version: int = Field(description="排行榜版本号，每次刷新加一")
+    refreshed_at: Optional[dt] = Field(default=None, description="最近一次刷新时间")
+    items: List[RankingEntry] = Field(default_factory=list, description="按贝叶斯平均分降序排列的条目")
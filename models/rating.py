@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 import sqlalchemy as sa
-from sqlmodel import Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship
 from models.base import BaseSQLModel
 from models.user import User
 from models.camera import Camera
@@ -47,4 +47,13 @@ class RatingUpdate(BaseSQLModel):
     target_type: Optional[str] = Field(sa_column=sa.Column(sa.String(20)), default=None, description="评分对象类型: camera-相机, lens-镜头")
     target_id: Optional[int] = Field(default=None, description="评分对象ID")
     score: Optional[float] = Field(ge=1, le=5, default=None, description="评分值，范围1-5分")
-    comment: Optional[str] = Field(sa_column=sa.Column(sa.String(500)), default=None, description="评分评论")
\ No newline at end of file
+    comment: Optional[str] = Field(sa_column=sa.Column(sa.String(500)), default=None, description="评分评论")
+
+class RatingSummary(SQLModel):
+    """评分对象的评分分布与统计值"""
+    target_type: str = Field(description="评分对象类型: camera-相机, lens-镜头")
+    target_id: int = Field(description="评分对象ID")
+    count: int = Field(default=0, description="评分人数")
+    mean: Optional[float] = Field(default=None, description="平均分")
+    median: Optional[float] = Field(default=None, description="中位数")
+    histogram: Dict[int, int] = Field(default_factory=dict, description="1-5星分布（评分四舍五入到整数星）")
@@ -0,0 +1,29 @@
+from typing import Dict, List, Optional, Union
+from sqlmodel import SQLModel, Field
+from models.camera import CameraRead
+
+class FacetCount(SQLModel):
+    """分面中的一个取值及其命中数量"""
+    value: Optional[Union[int, str]] = Field(default=None, description="取值，为空表示未填写")
+    count: int = Field(description="命中数量")
+
+class CameraSearchResult(SQLModel):
+    """相机分面搜索响应"""
+    total: int = Field(description="满足全部过滤条件的相机总数")
+    items: List[CameraRead] = Field(default_factory=list, description="当前页的相机")
+    facets: Dict[str, List[FacetCount]] = Field(
+        default_factory=dict,
+        description="各维度的取值计数；每个维度的计数不受该维度自身过滤条件影响，便于多选"
+    )
+
+class AutocompleteItem(SQLModel):
+    """自动补全的一条候选"""
+    type: str = Field(description="对象类型: brand-品牌, mount-卡口, camera-相机, lens-镜头")
+    id: int = Field(description="对象ID")
+    label: str = Field(description="显示名称")
+    matched: str = Field(description="命中的文本（可能是中文名称或型号代码）")
+
+class CameraLookupMatch(SQLModel):
+    """型号查找的一条结果"""
+    score: float = Field(description="匹配得分：1为规范化后完全一致，否则为三元组相似度")
+    camera: CameraRead
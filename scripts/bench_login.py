@@ -0,0 +1,63 @@
+"""
+登录接口压测脚本：模拟多个并发客户端持续调用 /users/login，输出吞吐量与延迟分布
+
+用法（需先启动服务并准备好测试账号，依赖httpx）：
+    python scripts/bench_login.py --url http://localhost:8000 --username bench --password bench123 \\
+        --clients 50 --requests 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+async def _client(client: httpx.AsyncClient, args, queue: asyncio.Queue, latencies: list, statuses: Counter):
+    payload = {"username": args.username, "email": args.email, "password": args.password}
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.post("/users/login", json=payload)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as exc:
+            statuses[type(exc).__name__] += 1
+        latencies.append(time.perf_counter() - start)
+
+async def main(args):
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+    latencies, statuses = [], Counter()
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _client(client, args, queue, latencies, statuses) for _ in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print(f"并发客户端: {args.clients}  请求总数: {len(latencies)}  总耗时: {elapsed:.2f}s")
+    print(f"吞吐量: {len(latencies) / elapsed:.1f} req/s")
+    print(f"延迟(ms): 平均 {statistics.mean(latencies) * 1000:.1f}  p50 {pct(0.5):.1f}  "
+          f"p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  最大 {latencies[-1] * 1000:.1f}")
+    print("状态码分布: " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="登录接口并发压测")
+    parser.add_argument("--url", default="http://localhost:8000", help="服务地址")
+    parser.add_argument("--username", required=True, help="测试账号用户名")
+    parser.add_argument("--password", required=True, help="测试账号密码")
+    parser.add_argument("--email", default="bench@example.com", help="登录请求体中的邮箱字段")
+    parser.add_argument("--clients", type=int, default=50, help="并发客户端数")
+    parser.add_argument("--requests", type=int, default=500, help="请求总数")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单个请求超时（秒）")
+    asyncio.run(main(parser.parse_args()))
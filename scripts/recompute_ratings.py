@@ -0,0 +1,17 @@
+"""
+评分聚合修复脚本：按评分表重新计算相机、镜头的 rating / rating_count / rating_sum
+
+用法（在项目根目录执行）：
+    python -m scripts.recompute_ratings
+"""
+from database.config import SessionLocal
+from services.ratings import recompute_rating_aggregates
+
+def main():
+    with SessionLocal() as session:
+        updated = recompute_rating_aggregates(session)
+    for target_type, count in updated.items():
+        print(f"{target_type}: 已重新计算 {count} 个对象的评分")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+评论数校正脚本：按评论表重新统计，修正 article.comment_count 的偏差
+
+用法（在项目根目录执行，可配置为定时任务）：
+    python -m scripts.reconcile_comment_counts
+"""
+from database.config import SessionLocal
+from services.articles import reconcile_comment_counts
+
+def main():
+    with SessionLocal() as session:
+        fixed = reconcile_comment_counts(session)
+    for article_id, count in fixed.items():
+        print(f"文章 {article_id}: 评论数修正为 {count}")
+    print(f"共修正 {len(fixed)} 篇文章")
+
+if __name__ == "__main__":
+    main()
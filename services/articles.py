@@ -0,0 +1,46 @@
+from typing import Dict
+
+from sqlalchemy import bindparam, case, func, update
+from sqlmodel import Session, select
+
+from models.article import Article
+from models.comment import Comment
+
+def adjust_comment_count(session: Session, article_id: int, delta: int):
+    """
+    以SQL增量调整文章的评论数，与评论的插入/删除在同一事务中提交
+    计数变化不算内容修改，保持updated_at不变；减到0为止，不会出现负数
+    """
+    new_count = Article.comment_count + delta
+    session.exec(
+        update(Article)
+        .where(Article.id == article_id)
+        .values(
+            comment_count=case((new_count > 0, new_count), else_=0),
+            updated_at=Article.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def reconcile_comment_counts(session: Session) -> Dict[int, int]:
+    """
+    修正评论数的偏差：一条分组查询找出 comment_count 与实际评论数不一致的文章，
+    再按主键批量更新；返回 {文章ID: 修正后的评论数}
+    """
+    actual = func.count(Comment.id)
+    drifted = session.exec(
+        select(Article.id, actual)
+        .outerjoin(Comment, Comment.article_id == Article.id)
+        .group_by(Article.id, Article.comment_count)
+        .having(Article.comment_count != actual)
+    ).all()
+    if drifted:
+        table = Article.__table__
+        session.exec(
+            update(table)
+            .where(table.c.id == bindparam("article_id"))
+            .values(comment_count=bindparam("actual"), updated_at=table.c.updated_at),
+            params=[{"article_id": article_id, "actual": count} for article_id, count in drifted],
+        )
+    session.commit()
+    return dict(drifted)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import re
+from bisect import bisect_left
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.config import AsyncSessionLocal
+from models.brand import Brand
+from models.camera import Camera
+from models.lens import Lens
+from models.mount import Mount
+from models.search import AutocompleteItem
+
+logger = logging.getLogger(__name__)
+
+# 自动补全索引的定时刷新间隔（秒）：多worker部署时用于同步其他进程的目录变更
+AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "300"))
+# 单次查询最多检查的前缀命中条目数，保证短前缀（如单个字母）时的响应时间
+AUTOCOMPLETE_SCAN_LIMIT = int(os.getenv("AUTOCOMPLETE_SCAN_LIMIT", "500"))
+
+# 同等匹配程度时的类型优先级：品牌、卡口在前
+TYPE_ORDER = ("brand", "mount", "camera", "lens")
+
+_SEPARATORS = re.compile(r"[\s\-_/·.]+")
+
+def normalize(text: str) -> str:
+    """索引键与查询统一规范化：忽略大小写、空格及常见分隔符，"EOS R5"、"eos-r5"、"EOSR5" 等价"""
+    return _SEPARATORS.sub("", text.casefold())
+
+class _Entry(NamedTuple):
+    word_start: bool
+    type_rank: int
+    length: int
+    type: str
+    id: int
+    label: str
+    matched: str
+
+def _entries(type_name: str, rows: Iterable[Tuple]) -> Iterable[Tuple[str, _Entry]]:
+    # 每行为 (id, 显示名称, 参与匹配的文本...)；除整串外，从每个词开头的后缀也建键，
+    # 使 "r5" 能匹配 "Canon EOS R5"
+    type_rank = TYPE_ORDER.index(type_name)
+    for row_id, label, *texts in rows:
+        for text in {t for t in texts if t}:
+            words = [w for w in _SEPARATORS.split(text) if w]
+            for index in range(len(words)):
+                key = normalize("".join(words[index:]))
+                if key:
+                    yield key, _Entry(index > 0, type_rank, len(text), type_name, row_id, label, text)
+
+class PrefixIndex:
+    """按规范化键排序的数组，前缀查询为一次二分查找加顺序扫描"""
+
+    def __init__(self, items: Iterable[Tuple[str, _Entry]]):
+        items = sorted(items, key=lambda item: (item[0], item[1]))
+        self.keys = [key for key, _ in items]
+        self.entries = [entry for _, entry in items]
+
+    def search(self, q: str, limit: int, types: Optional[Iterable[str]] = None) -> List[AutocompleteItem]:
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        types = set(types) if types else None
+        best = {}
+        start = bisect_left(self.keys, prefix)
+        for index in range(start, min(start + AUTOCOMPLETE_SCAN_LIMIT, len(self.keys))):
+            key = self.keys[index]
+            if not key.startswith(prefix):
+                break
+            entry = self.entries[index]
+            if types and entry.type not in types:
+                continue
+            # 排序：完全匹配 > 整串前缀 > 词首前缀；其次按类型优先级、文本长度
+            rank = (key != prefix, entry.word_start, entry.type_rank, entry.length, entry.label)
+            target = (entry.type, entry.id)
+            if target not in best or rank < best[target][0]:
+                best[target] = (rank, entry)
+        ranked = sorted(best.values(), key=lambda item: item[0])[:limit]
+        return [
+            AutocompleteItem(type=entry.type, id=entry.id, label=entry.label, matched=entry.matched)
+            for _, entry in ranked
+        ]
+
+async def _load_items(db: AsyncSession) -> List[Tuple[str, _Entry]]:
+    sources = (
+        ("brand", select(Brand.id, Brand.name, Brand.name, Brand.name_zh)),
+        ("mount", select(Mount.id, Mount.name, Mount.name, Mount.name_zh)),
+        ("camera", select(Camera.id, Camera.name, Camera.name, Camera.name_zh, Camera.model_code)),
+        ("lens", select(Lens.id, Lens.model, Lens.model, Lens.model_zh)),
+    )
+    items = []
+    for type_name, query in sources:
+        items.extend(_entries(type_name, (await db.exec(query)).all()))
+    return items
+
+class AutocompleteIndex:
+    """
+    进程内的目录名称前缀索引（品牌、卡口、相机、镜头的中英文名称与型号代码）
+    首次查询时构建；目录写操作后在后台重建，重建期间继续使用旧索引，请求路径上不访问数据库
+    """
+
+    def __init__(self):
+        self._index: Optional[PrefixIndex] = None
+        self._lock = asyncio.Lock()
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        async with self._lock:
+            await self._refresh()
+
+    async def _refresh(self):
+        async with AsyncSessionLocal() as db:
+            items = await _load_items(db)
+        # 整体替换，查询方不会看到半构建的索引
+        self._index = PrefixIndex(items)
+
+    async def search(self, q: str, limit: int, types: Optional[Iterable[str]] = None) -> List[AutocompleteItem]:
+        if self._index is None:
+            # 并发请求只触发一次构建
+            async with self._lock:
+                if self._index is None:
+                    await self._refresh()
+        return self._index.search(q, limit, types)
+
+    def invalidate(self):
+        """目录写操作提交后调用：安排一次后台重建，连续多次写入合并为尽量少的重建"""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._rebuild_while_dirty())
+
+    async def _rebuild_while_dirty(self):
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("自动补全索引重建失败")
+                return
+
+    async def run_periodic_refresh(self, interval: float = AUTOCOMPLETE_REFRESH_SECONDS):
+        """后台定时刷新，由应用生命周期启动；单次失败只记录日志"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("自动补全索引刷新失败")
+
+autocomplete_index = AutocompleteIndex()
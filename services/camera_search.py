@@ -0,0 +1,84 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.camera import Camera
+from models.search import CameraSearchResult, FacetCount
+from utils.http_cache import count_validators
+
+# 分面维度：参与分组统计，并可按多个取值过滤
+FACET_COLUMNS = ("brand_id", "mount_id", "sensor_size", "sensor_type", "type", "release_year")
+
+def _matches(group: Sequence[Any], selected: Dict[str, set], ignore: Optional[str] = None) -> bool:
+    return all(
+        group[index] in selected[name]
+        for index, name in enumerate(FACET_COLUMNS)
+        if name in selected and name != ignore
+    )
+
+def build_facets(groups: Sequence[Sequence[Any]], selected: Dict[str, set]) -> Tuple[int, Dict[str, List[FacetCount]]]:
+    """
+    由按全部分面维度分组的计数行计算总数与各维度的分面计数
+    每个维度的计数忽略该维度自身的选择（析取分面），侧边栏勾选后其他取值的数量仍可见
+    """
+    counters = {name: Counter() for name in FACET_COLUMNS}
+    total = 0
+    for group in groups:
+        count = group[len(FACET_COLUMNS)]
+        for index, name in enumerate(FACET_COLUMNS):
+            if _matches(group, selected, ignore=name):
+                counters[name][group[index]] += count
+        if _matches(group, selected):
+            total += count
+    facets = {
+        name: [
+            FacetCount(value=value, count=count)
+            for value, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+        for name, counter in counters.items()
+    }
+    return total, facets
+
+async def search_cameras(
+    db: AsyncSession,
+    selected: Dict[str, Optional[List[Any]]],
+    conditions: Sequence[Any],
+    skip: int,
+    limit: int,
+):
+    """
+    相机分面搜索，共两条查询：
+    一条按全部分面维度 GROUP BY 得到组合计数，分面计数与总数都在内存中由它汇总，不再逐个取值COUNT；
+    另一条查询当前页。conditions 为范围等非分面条件，对分面计数同样生效
+    返回搜索结果及用于条件请求的 (ETag, Last-Modified)
+    """
+    selected = {name: set(values) for name, values in selected.items() if values}
+    columns = [getattr(Camera, name) for name in FACET_COLUMNS]
+    groups = (await db.exec(
+        select(*columns, func.count(), func.max(Camera.updated_at))
+        .where(*conditions)
+        .group_by(*columns)
+    )).all()
+    total, facets = build_facets(groups, selected)
+    
+    query = (
+        select(Camera)
+        .where(*conditions, *(getattr(Camera, name).in_(values) for name, values in selected.items()))
+        .order_by(Camera.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    cameras = (await db.exec(query)).all()
+    result = CameraSearchResult.model_validate(
+        {"total": total, "items": cameras, "facets": facets}, from_attributes=True
+    )
+    # 校验信息覆盖分面统计涉及的全部行，页外的相机变化时同样失效
+    timestamps = [group[-1] for group in groups if group[-1]]
+    validators = count_validators(
+        sum(group[len(FACET_COLUMNS)] for group in groups),
+        max(timestamps) if timestamps else None,
+    )
+    return result, validators
@@ -0,0 +1,207 @@
+import asyncio
+import heapq
+import logging
+import os
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.config import AsyncSessionLocal
+from models.camera import Camera
+from models.lens import Lens
+from models.lens_mount_link import LensMountLink
+
+logger = logging.getLogger(__name__)
+
+# 兼容性索引全量重建的间隔（秒）：多worker部署时用于同步其他进程的增量变更
+COMPATIBILITY_REBUILD_SECONDS = float(os.getenv("COMPATIBILITY_REBUILD_SECONDS", "300"))
+
+def _discard(ids: List[int], item_id: int):
+    index = bisect_left(ids, item_id)
+    if index < len(ids) and ids[index] == item_id:
+        del ids[index]
+
+class _CompatibilityState:
+    """卡口 -> 有序相机ID / 有序镜头ID，以及反向的 相机 -> 卡口、镜头 -> 卡口"""
+
+    def __init__(self):
+        self.camera_mount: Dict[int, Optional[int]] = {}
+        self.lens_mounts: Dict[int, Tuple[int, ...]] = {}
+        self.cameras_by_mount: Dict[int, List[int]] = defaultdict(list)
+        self.lenses_by_mount: Dict[int, List[int]] = defaultdict(list)
+
+    @classmethod
+    def build(cls, cameras: Iterable[Tuple[int, Optional[int]]], lens_links: Iterable[Tuple[int, Optional[int]]]):
+        """由按ID升序的 (相机ID, 卡口ID)、(镜头ID, 卡口ID) 行构建，追加即有序"""
+        state = cls()
+        for camera_id, mount_id in cameras:
+            state.camera_mount[camera_id] = mount_id
+            if mount_id is not None:
+                state.cameras_by_mount[mount_id].append(camera_id)
+        mounts: Dict[int, List[int]] = defaultdict(list)
+        for lens_id, mount_id in lens_links:
+            # 外连接：没有卡口关联的镜头也登记，以区分"镜头不存在"
+            lens_mount_ids = mounts[lens_id]
+            if mount_id is not None:
+                lens_mount_ids.append(mount_id)
+                state.lenses_by_mount[mount_id].append(lens_id)
+        state.lens_mounts = {lens_id: tuple(sorted(ids)) for lens_id, ids in mounts.items()}
+        return state
+
+    def set_camera(self, camera_id: int, mount_id: Optional[int]):
+        self.remove_camera(camera_id)
+        self.camera_mount[camera_id] = mount_id
+        if mount_id is not None:
+            insort(self.cameras_by_mount[mount_id], camera_id)
+
+    def remove_camera(self, camera_id: int):
+        mount_id = self.camera_mount.pop(camera_id, None)
+        if mount_id is not None:
+            _discard(self.cameras_by_mount[mount_id], camera_id)
+
+    def set_lens(self, lens_id: int, mount_ids: Iterable[int]):
+        self.remove_lens(lens_id)
+        self.lens_mounts[lens_id] = tuple(sorted(set(mount_ids)))
+        for mount_id in self.lens_mounts[lens_id]:
+            insort(self.lenses_by_mount[mount_id], lens_id)
+
+    def remove_lens(self, lens_id: int):
+        for mount_id in self.lens_mounts.pop(lens_id, ()):
+            _discard(self.lenses_by_mount[mount_id], lens_id)
+
+class CompatibilityIndex:
+    """
+    进程内的相机-镜头兼容性索引：相机与镜头通过卡口关联，按卡口预建有序ID列表，
+    "哪些镜头适用于这台相机"只需一次字典查找，无需多表JOIN
+
+    首次读取时全量构建；相机、镜头及其卡口关联的增删改由接口在提交后增量更新，
+    批量导入后整体失效重建。重建期间发生的增量变更会在新索引上重放，避免被旧数据覆盖。
+    每个worker进程各自一份，其他进程的变更在下次定时重建后可见
+    """
+
+    def __init__(self):
+        self._state: Optional[_CompatibilityState] = None
+        # 正在重建时记录增量变更，重建完成后重放
+        self._journal: Optional[List[Tuple[str, tuple]]] = None
+        self._stale = False
+        self._lock = asyncio.Lock()
+
+    async def rebuild(self):
+        async with self._lock:
+            await self._rebuild()
+
+    async def _rebuild(self):
+        self._journal, self._stale = [], False
+        try:
+            async with AsyncSessionLocal() as db:
+                cameras = (await db.exec(
+                    select(Camera.id, Camera.mount_id).order_by(Camera.id)
+                )).all()
+                lens_links = (await db.exec(
+                    select(Lens.id, LensMountLink.mount_id)
+                    .outerjoin(LensMountLink, LensMountLink.lens_id == Lens.id)
+                    .order_by(Lens.id)
+                )).all()
+            state = _CompatibilityState.build(cameras, lens_links)
+            for op, args in self._journal:
+                getattr(state, op)(*args)
+            # 重建期间被整体失效时丢弃本次结果，由下次读取重新构建
+            if not self._stale:
+                self._state = state
+        finally:
+            self._journal = None
+
+    async def _loaded(self) -> _CompatibilityState:
+        while self._state is None:
+            # 并发请求只触发一次构建
+            async with self._lock:
+                if self._state is None:
+                    await self._rebuild()
+        return self._state
+
+    def _apply(self, op: str, *args):
+        if self._state is not None:
+            getattr(self._state, op)(*args)
+        if self._journal is not None:
+            self._journal.append((op, args))
+
+    def camera_changed(self, camera_id: int, mount_id: Optional[int]):
+        self._apply("set_camera", camera_id, mount_id)
+
+    def camera_removed(self, camera_id: int):
+        self._apply("remove_camera", camera_id)
+
+    def lens_changed(self, lens_id: int, mount_ids: Iterable[int]):
+        self._apply("set_lens", lens_id, tuple(mount_ids))
+
+    def lens_removed(self, lens_id: int):
+        self._apply("remove_lens", lens_id)
+
+    def invalidate(self):
+        """批量变更后丢弃整个索引，下次读取时全量重建"""
+        self._state = None
+        self._stale = True
+
+    async def lenses_for_camera(self, db: AsyncSession, camera_id: int) -> Optional[List[int]]:
+        """适用于该相机的镜头ID（升序）；相机不存在时返回None"""
+        state = await self._loaded()
+        if camera_id not in state.camera_mount:
+            # 其他进程新建的相机：查库补入索引
+            row = (await db.exec(select(Camera.id, Camera.mount_id).where(Camera.id == camera_id))).first()
+            if row is None:
+                return None
+            self.camera_changed(*row)
+            state = await self._loaded()
+        mount_id = state.camera_mount.get(camera_id)
+        return list(state.lenses_by_mount.get(mount_id, ())) if mount_id is not None else []
+
+    async def cameras_for_lens(self, db: AsyncSession, lens_id: int) -> Optional[List[int]]:
+        """可使用该镜头的相机ID（升序）；镜头不存在时返回None"""
+        state = await self._loaded()
+        if lens_id not in state.lens_mounts:
+            # 其他进程新建的镜头：查库补入索引
+            if await db.get(Lens, lens_id) is None:
+                return None
+            mount_ids = (await db.exec(
+                select(LensMountLink.mount_id).where(LensMountLink.lens_id == lens_id)
+            )).all()
+            self.lens_changed(lens_id, mount_ids)
+            state = await self._loaded()
+        # 一台相机只有一个卡口，各卡口的相机列表互不重叠，归并即得有序结果
+        return list(heapq.merge(*(
+            state.cameras_by_mount.get(mount_id, ()) for mount_id in state.lens_mounts.get(lens_id, ())
+        )))
+
+    async def run_periodic_rebuild(self, interval: float = COMPATIBILITY_REBUILD_SECONDS):
+        """后台定时全量重建，由应用生命周期启动；单次失败只记录日志"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("兼容性索引重建失败")
+
+compatibility_index = CompatibilityIndex()
+
+async def load_page(
+    db: AsyncSession,
+    model: Type[SQLModel],
+    ids: Sequence[int],
+    conditions: Sequence[Any],
+    skip: int,
+    limit: int,
+) -> List[Any]:
+    """
+    按索引给出的有序ID分页读取对象：无额外条件时先在内存中切出本页ID再按主键查询；
+    有条件时在这些ID内过滤后分页
+    """
+    if not conditions:
+        ids = ids[skip:skip + limit]
+        skip = 0
+    if not ids:
+        return []
+    query = select(model).where(model.id.in_(ids), *conditions).order_by(model.id)
+    return (await db.exec(query.offset(skip).limit(limit))).all()
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.config import AsyncSessionLocal
+from models.camera import Camera
+from models.search import CameraLookupMatch
+from utils.model_codes import normalize_model_code, trigrams
+
+# 相似度回退时的最低得分，低于该值的候选不返回
+MODEL_LOOKUP_MIN_SCORE = float(os.getenv("MODEL_LOOKUP_MIN_SCORE", "0.3"))
+
+class ModelCodeIndex:
+    """
+    规范化型号代码的三元组倒排索引，精确匹配失败时在内存中计算Dice相似度
+    首次查找时构建，相机写操作后整体失效，下次查找时重建
+    """
+
+    def __init__(self):
+        self._postings: Optional[Dict[str, List[int]]] = None
+        self._sizes: Dict[int, int] = {}
+        self._stale = False
+        self._lock = asyncio.Lock()
+
+    async def _rebuild(self):
+        self._stale = False
+        async with AsyncSessionLocal() as db:
+            rows = (await db.exec(
+                select(Camera.id, Camera.model_code_key).where(Camera.model_code_key.is_not(None))
+            )).all()
+        postings: Dict[str, List[int]] = defaultdict(list)
+        sizes = {}
+        for camera_id, key in rows:
+            grams = trigrams(key)
+            sizes[camera_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(camera_id)
+        # 构建期间被失效时丢弃本次结果，由下次查找重新构建
+        if not self._stale:
+            self._postings, self._sizes = dict(postings), sizes
+
+    def invalidate(self):
+        self._postings = None
+        self._stale = True
+
+    async def similar(self, key: str, limit: int, min_score: float = MODEL_LOOKUP_MIN_SCORE) -> List[Tuple[int, float]]:
+        """按Dice系数 2|A∩B|/(|A|+|B|) 返回最相似的 (相机ID, 得分)，只统计与查询共享三元组的相机"""
+        while self._postings is None:
+            # 并发请求只触发一次构建
+            async with self._lock:
+                if self._postings is None:
+                    await self._rebuild()
+        postings, sizes = self._postings, self._sizes
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(postings.get(gram, ()))
+        scored = [
+            (camera_id, round(2 * common / (len(grams) + sizes[camera_id]), 4))
+            for camera_id, common in shared.items()
+        ]
+        scored = [item for item in scored if item[1] >= min_score]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+model_code_index = ModelCodeIndex()
+
+async def lookup_cameras(db: AsyncSession, code: str, limit: int) -> Optional[List[CameraLookupMatch]]:
+    """
+    按型号代码查找相机：先用规范化键在索引列上精确匹配，没有结果时回退到内存中的三元组相似度
+    输入规范化后为空时返回None
+    """
+    key = normalize_model_code(code)
+    if not key:
+        return None
+    exact = (await db.exec(
+        select(Camera).where(Camera.model_code_key == key).order_by(Camera.id).limit(limit)
+    )).all()
+    if exact:
+        return [CameraLookupMatch(score=1.0, camera=camera) for camera in exact]
+    
+    matches = await model_code_index.similar(key, limit)
+    if not matches:
+        return []
+    cameras = {camera.id: camera for camera in (await db.exec(
+        select(Camera).where(Camera.id.in_([camera_id for camera_id, _ in matches]))
+    )).all()}
+    return [
+        CameraLookupMatch(score=score, camera=cameras[camera_id])
+        for camera_id, score in matches
+        if camera_id in cameras
+    ]
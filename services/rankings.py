@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime as dt, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.config import AsyncSessionLocal
+from models.camera import Camera
+from models.lens import Lens
+from models.lens_mount_link import LensMountLink
+from models.ranking import RankingEntry
+
+logger = logging.getLogger(__name__)
+
+# 贝叶斯平均的先验权重：相当于每个对象预先获得C个"全站平均分"的评分，评分人数少时向均值收缩
+RANKING_PRIOR_WEIGHT = float(os.getenv("RANKING_PRIOR_WEIGHT", "10"))
+# 排行榜定时刷新间隔（秒）
+RANKING_REFRESH_SECONDS = float(os.getenv("RANKING_REFRESH_SECONDS", "60"))
+
+def bayesian_score(score_sum: float, count: int, prior_mean: float, prior_weight: float = RANKING_PRIOR_WEIGHT) -> float:
+    """贝叶斯(阻尼)平均：(C*m + Σscore) / (C + n)"""
+    return (prior_weight * prior_mean + score_sum) / (prior_weight + count)
+
+class Ranking:
+    """某一类对象的排行榜快照：全量有序列表及按品牌、卡口预建的索引"""
+
+    def __init__(self, entries: List[RankingEntry], version: int, refreshed_at: Optional[dt]):
+        self.entries = sorted(entries, key=lambda e: (-e.score, -e.rating_count, e.id))
+        self.version = version
+        self.refreshed_at = refreshed_at
+        self._by_brand: Dict[int, List[RankingEntry]] = defaultdict(list)
+        self._by_mount: Dict[int, List[RankingEntry]] = defaultdict(list)
+        for entry in self.entries:
+            if entry.brand_id is not None:
+                self._by_brand[entry.brand_id].append(entry)
+            for mount_id in entry.mount_ids:
+                self._by_mount[mount_id].append(entry)
+        # 品牌+卡口组合筛选的结果按需计算后缓存，快照不可变，无需失效
+        self._combined: Dict[Tuple[int, int], List[RankingEntry]] = {}
+
+    def filter(self, brand_id: Optional[int] = None, mount_id: Optional[int] = None) -> List[RankingEntry]:
+        if brand_id is None and mount_id is None:
+            return self.entries
+        if mount_id is None:
+            return self._by_brand.get(brand_id, [])
+        if brand_id is None:
+            return self._by_mount.get(mount_id, [])
+        key = (brand_id, mount_id)
+        if key not in self._combined:
+            self._combined[key] = [e for e in self._by_brand.get(brand_id, []) if mount_id in e.mount_ids]
+        return self._combined[key]
+
+async def _load_camera_entries(db: AsyncSession) -> List[RankingEntry]:
+    rows = (await db.exec(
+        select(Camera.id, Camera.name, Camera.brand_id, Camera.mount_id, Camera.rating_sum, Camera.rating_count)
+        .where(Camera.rating_count > 0)
+    )).all()
+    return _build_entries(
+        (id, name, brand_id, [mount_id] if mount_id else [], rating_sum, count)
+        for id, name, brand_id, mount_id, rating_sum, count in rows
+    )
+
+async def _load_lens_entries(db: AsyncSession) -> List[RankingEntry]:
+    rows = (await db.exec(
+        select(Lens.id, Lens.model, Lens.brand_id, Lens.rating_sum, Lens.rating_count)
+        .where(Lens.rating_count > 0)
+    )).all()
+    mounts: Dict[int, List[int]] = defaultdict(list)
+    for lens_id, mount_id in (await db.exec(
+        select(LensMountLink.lens_id, LensMountLink.mount_id)
+        .join(Lens, Lens.id == LensMountLink.lens_id)
+        .where(Lens.rating_count > 0)
+    )).all():
+        mounts[lens_id].append(mount_id)
+    return _build_entries(
+        (id, model, brand_id, mounts.get(id, []), rating_sum, count)
+        for id, model, brand_id, rating_sum, count in rows
+    )
+
+def _build_entries(rows) -> List[RankingEntry]:
+    rows = list(rows)
+    total_count = sum(row[5] for row in rows)
+    # 全站平均分作为先验均值
+    prior_mean = float(sum(row[4] for row in rows)) / total_count if total_count else 0.0
+    return [
+        RankingEntry(
+            id=id,
+            name=name,
+            brand_id=brand_id,
+            mount_ids=sorted(mount_ids),
+            rating_count=count,
+            average=round(float(rating_sum) / count, 2),
+            score=round(bayesian_score(float(rating_sum), count, prior_mean), 4),
+        )
+        for id, name, brand_id, mount_ids, rating_sum, count in rows
+    ]
+
+class RankingStore:
+    """
+    进程内排行榜：定时从相机/镜头的评分聚合字段（由评分接口增量维护）重建，
+    请求只读取内存中的不可变快照；每次刷新版本号加一
+    """
+
+    loaders = {
+        "camera": _load_camera_entries,
+        "lens": _load_lens_entries,
+    }
+
+    def __init__(self):
+        self.version = 0
+        self._rankings: Dict[str, Ranking] = {}
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        async with self._lock:
+            await self._refresh()
+
+    async def _refresh(self):
+        async with AsyncSessionLocal() as db:
+            entries = {target_type: await loader(db) for target_type, loader in self.loaders.items()}
+        self.version += 1
+        refreshed_at = dt.now(timezone.utc)
+        # 整体替换快照，读取方不会看到半更新的状态
+        self._rankings = {
+            target_type: Ranking(items, self.version, refreshed_at)
+            for target_type, items in entries.items()
+        }
+
+    async def get(self, target_type: str) -> Ranking:
+        if target_type not in self._rankings:
+            # 启动后尚未完成首次刷新时等待刷新完成，并发请求只触发一次
+            async with self._lock:
+                if target_type not in self._rankings:
+                    await self._refresh()
+        return self._rankings[target_type]
+
+    async def run_periodic_refresh(self, interval: float = RANKING_REFRESH_SECONDS):
+        """后台定时刷新，由应用生命周期启动；单次失败只记录日志"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("排行榜刷新失败")
+            await asyncio.sleep(interval)
+
+ranking_store = RankingStore()
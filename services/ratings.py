@@ -0,0 +1,148 @@
+import os
+from typing import Dict, Iterable, List, Type
+
+from sqlalchemy import bindparam, case, func, update
+from sqlmodel import Session, SQLModel, select
+
+from models.camera import Camera
+from models.lens import Lens
+from models.rating import Rating, RatingSummary
+from utils.cache import TTLCache
+
+# 评分对象类型 -> 维护聚合字段(rating/rating_count/rating_sum)的模型
+RATING_TARGETS: Dict[str, Type[SQLModel]] = {
+    "camera": Camera,
+    "lens": Lens,
+}
+
+# 评分分布缓存：(target_type, target_id) -> RatingSummary，由评分写接口失效
+summary_cache = TTLCache(
+    maxsize=int(os.getenv("RATING_SUMMARY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("RATING_SUMMARY_CACHE_TTL", "300")),
+)
+
+def apply_rating_delta(session: Session, target_type: str, target_id: int, score_delta: float, count_delta: int):
+    """
+    以SQL增量更新评分对象的聚合字段，与评分的增删改在同一事务中提交
+    新均值由 旧值+增量 计算并放在SET的第一位：MySQL按顺序执行赋值，
+    放在最前可保证读到的是更新前的 rating_sum / rating_count，不存在读-改-写竞争
+    """
+    model = RATING_TARGETS.get(target_type)
+    if model is None or (not score_delta and not count_delta):
+        return
+    new_sum = model.rating_sum + score_delta
+    new_count = model.rating_count + count_delta
+    session.exec(
+        update(model)
+        .where(model.id == target_id)
+        .ordered_values(
+            (model.rating, case((new_count > 0, func.round(new_sum / new_count, 1)), else_=None)),
+            (model.rating_sum, new_sum),
+            (model.rating_count, new_count),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def recompute_rating_aggregates(session: Session) -> Dict[str, int]:
+    """
+    按评分表重新计算全部聚合字段，用于修复历史数据或排查不一致
+    一条分组查询取出所有对象的总和与人数，再按主键批量更新；没有评分的对象清零
+    返回各类型中有评分的对象数
+    """
+    totals = session.exec(
+        select(Rating.target_type, Rating.target_id, func.sum(Rating.score), func.count())
+        .group_by(Rating.target_type, Rating.target_id)
+    ).all()
+
+    rows: Dict[str, list] = {target_type: [] for target_type in RATING_TARGETS}
+    for target_type, target_id, score_sum, count in totals:
+        if target_type in rows:
+            rows[target_type].append({
+                "target_id": target_id,
+                "new_sum": score_sum,
+                "new_count": count,
+                "new_rating": round(score_sum / count, 1),
+            })
+
+    for target_type, model in RATING_TARGETS.items():
+        session.exec(
+            update(model)
+            .where((model.rating_count != 0) | (model.rating_sum != 0))
+            .values(rating=None, rating_sum=0, rating_count=0)
+        )
+        if rows[target_type]:
+            # 表级update配合参数列表以executemany执行；已删除对象的评分匹配不到行，直接忽略
+            table = model.__table__
+            session.exec(
+                update(table)
+                .where(table.c.id == bindparam("target_id"))
+                .values(
+                    rating=bindparam("new_rating"),
+                    rating_sum=bindparam("new_sum"),
+                    rating_count=bindparam("new_count"),
+                ),
+                params=rows[target_type],
+            )
+    session.commit()
+    return {target_type: len(items) for target_type, items in rows.items()}
+
+def _summarize(target_type: str, target_id: int, scores: List[tuple]) -> RatingSummary:
+    """由 (分值, 人数) 列表计算分布、均值与中位数"""
+    scores.sort()
+    count = sum(n for _, n in scores)
+    histogram = {star: 0 for star in range(1, 6)}
+    for score, n in scores:
+        # 与MySQL ROUND一致：半星向上取整
+        star = min(max(int(score + 0.5), 1), 5)
+        histogram[star] += n
+    if not count:
+        return RatingSummary(target_type=target_type, target_id=target_id, histogram=histogram)
+
+    # 中位数：按分值顺序累计人数，取第 (count-1)//2 与 count//2 个评分的平均
+    middle, seen = [], 0
+    for score, n in scores:
+        for position in {(count - 1) // 2, count // 2}:
+            if seen <= position < seen + n:
+                middle.append(score)
+        seen += n
+    median = middle[0] if len(middle) == 1 else (middle[0] + middle[1]) / 2
+    return RatingSummary(
+        target_type=target_type,
+        target_id=target_id,
+        count=count,
+        mean=round(sum(score * n for score, n in scores) / count, 2),
+        median=round(median, 2),
+        histogram=histogram,
+    )
+
+def rating_summaries(session: Session, target_type: str, target_ids: Iterable[int]) -> Dict[int, RatingSummary]:
+    """
+    批量获取评分分布：先查缓存，未命中的对象用一条按 (target_id, score) 分组的查询一起计算
+    """
+    result: Dict[int, RatingSummary] = {}
+    missing = []
+    for target_id in dict.fromkeys(target_ids):
+        cached = summary_cache.get((target_type, target_id))
+        if cached is not None:
+            result[target_id] = cached
+        else:
+            missing.append(target_id)
+    if not missing:
+        return result
+
+    scores: Dict[int, List[tuple]] = {target_id: [] for target_id in missing}
+    rows = session.exec(
+        select(Rating.target_id, Rating.score, func.count())
+        .where(Rating.target_type == target_type, Rating.target_id.in_(missing))
+        .group_by(Rating.target_id, Rating.score)
+    ).all()
+    for target_id, score, n in rows:
+        scores[target_id].append((score, n))
+    for target_id in missing:
+        summary = _summarize(target_type, target_id, scores[target_id])
+        summary_cache.set((target_type, target_id), summary)
+        result[target_id] = summary
+    return result
+
+def invalidate_rating_summary(target_type: str, target_id: int):
+    summary_cache.pop((target_type, target_id))
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# 应用模块导入时即创建引擎，须先配置连接串；测试用例各自使用独立的临时SQLite库
+_DB_PATH = os.path.join(tempfile.gettempdir(), "backend-tests.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_DB_PATH}")
+os.environ.setdefault("SQLALCHEMY_ASYNC_DATABASE_URI", f"sqlite+aiosqlite:///{_DB_PATH}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
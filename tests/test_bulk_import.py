@@ -0,0 +1,63 @@
+"""批量导入的唯一性校验与数据库排序规则一致，不区分大小写"""
+from datetime import datetime as dt
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app as app_module
+from auth.auth import get_current_admin
+from database.config import get_async_db
+from models.brand import Brand
+from utils.response_cache import response_cache
+
+try:
+    configure_mappers()
+except Exception as exc:
+    pytest.skip(f"模型关系无法完成配置，跳过依赖ORM的接口测试：{exc}", allow_module_level=True)
+
+@pytest.fixture()
+def client(tmp_path):
+    from fastapi.testclient import TestClient
+
+    path = tmp_path / "catalog.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(sync_engine)
+    now = dt(2024, 1, 1)
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Brand.__table__), [{"id": 1, "name": "Sony", "created_at": now, "updated_at": now}])
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def override_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
+
+    app_module.app.dependency_overrides[get_async_db] = override_db
+    app_module.app.dependency_overrides[get_current_admin] = lambda: None
+    response_cache.clear()
+    yield TestClient(app_module.app)
+    app_module.app.dependency_overrides.clear()
+    response_cache.clear()
+
+def test_bulk_cameras_reject_case_variant_model_codes(client):
+    camera = {"name": "A7 IV", "brand_id": 1, "release_year": 2021, "sensor_type": "CMOS", "sensor_size": "全画幅"}
+    response = client.post("/cameras/bulk", json=[
+        {**camera, "model_code": "ILCE-7M4"},
+        {**camera, "model_code": "ilce-7m4"},
+    ])
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert [error["index"] for error in response.json()["errors"]] == [1]
+
+def test_bulk_lenses_reject_case_variant_models(client):
+    response = client.post("/lenses/bulk", json=[
+        {"model": "FE 24-70mm F2.8 GM II", "brand_id": 1},
+        {"model": "fe 24-70mm f2.8 gm ii", "brand_id": 1},
+    ])
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert [error["index"] for error in response.json()["errors"]] == [1]
@@ -0,0 +1,59 @@
+"""导出接口中的关联名称列表：名称含逗号时不被拆开"""
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app as app_module
+from api import export
+from auth.auth import get_current_admin
+from models.brand import Brand
+from models.brand_mount_link import BrandMountLink
+from models.mount import Mount
+
+try:
+    configure_mappers()
+except Exception as exc:
+    pytest.skip(f"模型关系无法完成配置，跳过依赖ORM的接口测试：{exc}", allow_module_level=True)
+
+MOUNT_NAMES = ["EF", "RF, full-frame"]
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    from datetime import datetime as dt
+    from fastapi.testclient import TestClient
+
+    path = tmp_path / "catalog.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(sync_engine)
+    stamps = {"created_at": dt(2024, 1, 1), "updated_at": dt(2024, 1, 1)}
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Brand.__table__), [{"id": 1, "name": "Canon", **stamps}, {"id": 2, "name": "Leica", **stamps}])
+        conn.execute(insert(Mount.__table__), [{"id": i, "name": name, **stamps} for i, name in enumerate(MOUNT_NAMES, 1)])
+        conn.execute(insert(BrandMountLink.__table__), [{"brand_id": 1, "mount_id": 1}, {"brand_id": 1, "mount_id": 2}])
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(export, "AsyncSessionLocal", async_sessionmaker(async_engine, class_=AsyncSession))
+    app_module.app.dependency_overrides[get_current_admin] = lambda: None
+    yield TestClient(app_module.app)
+    app_module.app.dependency_overrides.clear()
+
+def test_ndjson_names_keep_commas(client):
+    response = client.get("/export/brands.ndjson", params={"relations": True})
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(records[0]["mount_names"]) == sorted(MOUNT_NAMES)
+    assert records[1]["mount_names"] == []
+
+def test_csv_names_are_json_arrays(client):
+    response = client.get("/export/brands.csv", params={"relations": True})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text.lstrip("﻿"))))
+    assert sorted(json.loads(rows[0]["mount_names"])) == sorted(MOUNT_NAMES)
+    assert json.loads(rows[1]["mount_names"]) == []
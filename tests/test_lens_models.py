@@ -0,0 +1,13 @@
+import pytest
+
+from models.lens import LensBulkItem, LensCreate, LensRead, LensUpdate
+
+@pytest.mark.parametrize("model", [LensCreate, LensBulkItem, LensUpdate])
+@pytest.mark.parametrize("field", ["rating", "rating_count"])
+def test_rating_aggregates_not_client_writable(model, field):
+    assert field not in model.model_fields
+    # 客户端传入的评分聚合字段被忽略
+    assert field not in model.model_validate({"model": "RF 50mm F1.8", field: 5}).model_dump(exclude_unset=True)
+
+def test_rating_aggregates_readable():
+    assert {"rating", "rating_count"} <= LensRead.model_fields.keys()
@@ -0,0 +1,37 @@
+import pytest
+
+from utils.model_codes import normalize_model_code, trigrams
+
+@pytest.mark.parametrize("code, expected", [
+    ("A7M4", "a7m4"),
+    ("a7 iv", "a7m4"),
+    ("A7 Mark IV", "a7m4"),
+    ("ILCE-7M4", "a7m4"),
+    # 罗马数字后缀紧跟型号数字时，字母不能被型号后缀吞掉
+    ("A7III", "a7m3"),
+    ("a7 iii", "a7m3"),
+    ("ILCE-7M3", "a7m3"),
+    ("Z6III", "z6m3"),
+    ("Z6 III", "z6m3"),
+    ("A7RIII", "a7rm3"),
+    ("ILCE-7RM3", "a7rm3"),
+    ("A7RIV", "a7rm4"),
+    ("a7R IV", "a7rm4"),
+    ("Z6II", "z6m2"),
+    ("Z6 Mark 2", "z6m2"),
+    ("X100VI", "x100m6"),
+    ("X-T4", "xt4"),
+    ("EOS-1D X Mark III", "eos1dxm3"),
+])
+def test_normalize_model_code(code, expected):
+    assert normalize_model_code(code) == expected
+
+@pytest.mark.parametrize("code", [None, "", "---"])
+def test_normalize_model_code_empty(code):
+    assert normalize_model_code(code) is None
+
+def test_normalize_model_code_custom_aliases():
+    assert normalize_model_code("DC-S5M2", aliases={"dcs": "s"}) == "s5m2"
+
+def test_trigrams_padded():
+    assert trigrams("z6") == {" z6", "z6 "}
@@ -0,0 +1,77 @@
+"""卡口、品牌、镜头的列表与详情接口的SQL语句数不随行数增长（无N+1）"""
+from datetime import datetime as dt
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import app as app_module
+from database.config import get_async_db
+from database.query_stats import install_query_stats
+from middleware import db_stats
+from models.brand import Brand
+from models.brand_mount_link import BrandMountLink
+from models.lens import Lens
+from models.lens_mount_link import LensMountLink
+from models.mount import Mount
+from utils.response_cache import response_cache
+
+try:
+    configure_mappers()
+except Exception as exc:
+    pytest.skip(f"模型关系无法完成配置，跳过依赖ORM的接口测试：{exc}", allow_module_level=True)
+
+ROWS = 20
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    path = tmp_path / "catalog.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(sync_engine)
+    now = dt(2024, 1, 1)
+    stamps = {"created_at": now, "updated_at": now}
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Brand.__table__), [{"id": i, "name": f"brand{i}", **stamps} for i in range(1, ROWS + 1)])
+        conn.execute(insert(Mount.__table__), [{"id": i, "name": f"mount{i}", **stamps} for i in range(1, ROWS + 1)])
+        conn.execute(insert(Lens.__table__), [
+            {"id": i, "model": f"lens{i}", "brand_id": i, "rating_sum": 0, **stamps} for i in range(1, ROWS + 1)
+        ])
+        # 每个卡口关联多个品牌与镜头，逐行懒加载时语句数会随行数成倍增长
+        conn.execute(insert(BrandMountLink.__table__), [
+            {"brand_id": b, "mount_id": m} for m in range(1, ROWS + 1) for b in range(1, 4)
+        ])
+        conn.execute(insert(LensMountLink.__table__), [
+            {"lens_id": l, "mount_id": m} for m in range(1, ROWS + 1) for l in range(1, 4)
+        ])
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    install_query_stats(async_engine.sync_engine)
+
+    async def override_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
+
+    monkeypatch.setattr(db_stats, "DEBUG", True)
+    app_module.app.dependency_overrides[get_async_db] = override_db
+    response_cache.clear()
+    # 不进入lifespan，避免启动后台任务
+    yield TestClient(app_module.app)
+    app_module.app.dependency_overrides.clear()
+    response_cache.clear()
+
+@pytest.mark.parametrize("path", [
+    "/mounts/", "/mounts/1",
+    "/brands/", "/brands/1",
+    "/lenses/", "/lenses/1",
+])
+def test_catalog_read_is_single_query(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    if path.endswith("/"):
+        assert len(response.json()) == ROWS
+    assert response.headers["X-DB-Queries"] == "1"
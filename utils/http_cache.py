@@ -0,0 +1,70 @@
+from datetime import datetime as dt, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+def _to_utc(value: Optional[dt]) -> Optional[dt]:
+    # 数据库中的时间为本地时间（naive），按本地时区转换为UTC
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc)
+
+def _stamp(value: Optional[dt]) -> str:
+    utc = _to_utc(value)
+    return format(int(utc.timestamp() * 1_000_000), "x") if utc else "0"
+
+def item_validators(item: Any) -> Tuple[str, Optional[dt]]:
+    """单条记录的弱ETag与最后修改时间，由 (id, updated_at) 计算"""
+    updated_at = getattr(item, "updated_at", None)
+    return f'W/"{item.id}-{_stamp(updated_at)}"', _to_utc(updated_at)
+
+def list_validators(items: Iterable[Any]) -> Tuple[str, Optional[dt]]:
+    """列表页的弱ETag与最后修改时间，由行数与最大 updated_at 计算"""
+    items = list(items)
+    timestamps = [i.updated_at for i in items if getattr(i, "updated_at", None)]
+    return count_validators(len(items), max(timestamps) if timestamps else None)
+
+def count_validators(count: int, latest: Optional[dt]) -> Tuple[str, Optional[dt]]:
+    """由行数与最大 updated_at 计算弱ETag，用于在SQL中聚合得到这两个值的结果（如分面统计）"""
+    return f'W/"n{count}-{_stamp(latest)}"', _to_utc(latest)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match 使用弱比较：忽略 W/ 前缀
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[dt],
+) -> Optional[Response]:
+    """
+    写入 ETag / Last-Modified 响应头，并处理条件请求
+    客户端缓存仍然有效时返回304响应（调用方直接返回它，跳过序列化），否则返回None
+    """
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        # 只有未携带 If-None-Match 时才使用 If-Modified-Since（RFC 9110）
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = False
+        if if_modified_since and last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and since.tzinfo is not None:
+                fresh = last_modified.replace(microsecond=0) <= since
+
+    if fresh:
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
@@ -0,0 +1,48 @@
+import re
+from typing import Dict, Optional, Tuple
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# 光圈部分的起始位置，如 "16-35mm F4"、"24-70mmf/2.8"；不匹配 "RF 24-105mm" 中卡口名里的F
+_APERTURE_START = re.compile(r"(?:(?<![a-z])|(?<=mm))f\s*/?\s*\d", re.IGNORECASE)
+# 光圈的比例写法前缀，如 "1:2.8-4"
+_RATIO_PREFIX = re.compile(r"1\s*:\s*")
+
+# 合理取值范围，超出视为无法解析
+_FOCAL_BOUNDS = (1.0, 2000.0)
+_APERTURE_BOUNDS = (0.5, 128.0)
+
+def _parse_range(text: str, bounds: Tuple[float, float]) -> Tuple[Optional[float], Optional[float]]:
+    # 取前两个数字作为区间两端，单个数字表示定焦/恒定值
+    values = [float(v) for v in _NUMBER.findall(text)[:2]]
+    if not values or not all(bounds[0] <= v <= bounds[1] for v in values):
+        return None, None
+    return min(values), max(values)
+
+def parse_focal_length(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    解析焦距文本为 (最短焦距, 最长焦距)，单位mm
+    支持 "24-70mm"、"50mm"、"70–200 mm"、"14～24毫米"、"16-35mm F4" 等写法，无法解析时返回 (None, None)
+    """
+    if not text:
+        return None, None
+    return _parse_range(_APERTURE_START.split(text, maxsplit=1)[0], _FOCAL_BOUNDS)
+
+def parse_aperture_range(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    解析光圈文本为 (最小f值, 最大f值)，最小f值即最大光圈
+    支持 "f/2.8-4"、"F2.8"、"f/4.5-5.6"、"1:2.8-4"、"f2.8–f4" 等写法，无法解析时返回 (None, None)
+    """
+    if not text:
+        return None, None
+    return _parse_range(_RATIO_PREFIX.sub("", text), _APERTURE_BOUNDS)
+
+def lens_spec_columns(focal_length: Optional[str], aperture_range: Optional[str]) -> Dict[str, Optional[float]]:
+    """由焦距、光圈文本计算镜头的数值规格列，创建、更新、导入和回填时共用"""
+    focal_min, focal_max = parse_focal_length(focal_length)
+    aperture_min, aperture_max = parse_aperture_range(aperture_range)
+    return {
+        "focal_min_mm": focal_min,
+        "focal_max_mm": focal_max,
+        "aperture_min": aperture_min,
+        "aperture_max": aperture_max,
+    }
@@ -0,0 +1,68 @@
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, Optional, Set
+
+# 罗马数字代数：只转换多字母形式，单独的 i / v / x 常是型号本身的一部分（如 X-T4）
+_ROMAN = {"ii": 2, "iii": 3, "iv": 4, "vi": 6, "vii": 7, "viii": 8, "ix": 9}
+_ROMAN_ALL = {"i": 1, "v": 5, "x": 10, **_ROMAN}
+_TOKEN = re.compile(r"[0-9a-z]+")
+# 紧跟在数字（及一个字母后缀）后的代数罗马数字，如 "z6ii"、"a7riv"
+# 字母后缀为非贪婪匹配，优先把字母留给罗马数字："a7iii" 为 a7+iii 而不是 a7i+ii
+_ROMAN_SUFFIX = re.compile(r"(\d[a-z]??)(" + "|".join(sorted(_ROMAN, key=len, reverse=True)) + r")$")
+# 词内的代数写法，如 "mark2"、"mkii"、"mk4"
+_MARK_INLINE = re.compile(r"(?:mark|mk)(\d+|" + "|".join(sorted(_ROMAN_ALL, key=len, reverse=True)) + r")$")
+
+# 型号前缀别名：规范化后的前缀 -> 替换值，如索尼机身代码 ILCE-7M4 即 A7 IV
+DEFAULT_MODEL_CODE_ALIASES = {"ilce": "a"}
+MODEL_CODE_ALIASES: Dict[str, str] = {
+    **DEFAULT_MODEL_CODE_ALIASES,
+    **json.loads(os.getenv("MODEL_CODE_ALIASES", "{}")),
+}
+
+def _generation(value: str) -> Optional[int]:
+    if value.isdigit():
+        return int(value)
+    return _ROMAN_ALL.get(value)
+
+def normalize_model_code(code: Optional[str], aliases: Dict[str, str] = MODEL_CODE_ALIASES) -> Optional[str]:
+    """
+    型号代码规范化，"A7M4"、"a7 iv"、"A7 Mark IV"、"ILCE-7M4" 均得到 "a7m4"：
+    1. Unicode兼容分解并忽略大小写，按非字母数字切分为词
+    2. 代数写法统一为 m+阿拉伯数字：独立的 ii/iii/iv…、mark/mk 加数字、紧跟型号数字的罗马数字后缀
+    3. 去掉分隔符拼接后，按别名表替换前缀
+    无有效字符时返回None
+    """
+    if not code:
+        return None
+    tokens = _TOKEN.findall(unicodedata.normalize("NFKC", code).casefold())
+    parts = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        following = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token in ("mark", "mk") and following and _generation(following):
+            parts.append(f"m{_generation(following)}")
+            index += 2
+            continue
+        if token in _ROMAN and parts:
+            parts.append(f"m{_ROMAN[token]}")
+        else:
+            inline = _MARK_INLINE.search(token)
+            if inline and inline.start() > 0:
+                token = f"{token[:inline.start()]}m{_generation(inline.group(1))}"
+            token = _ROMAN_SUFFIX.sub(lambda m: f"{m.group(1)}m{_ROMAN[m.group(2)]}", token)
+            parts.append(token)
+        index += 1
+    key = "".join(parts)
+    for prefix in sorted(aliases, key=len, reverse=True):
+        if key.startswith(prefix):
+            key = aliases[prefix] + key[len(prefix):]
+            break
+    return key or None
+
+def trigrams(key: str) -> Set[str]:
+    """首尾补空格后的三元组集合，用于相似度计算"""
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
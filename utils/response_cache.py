@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime as dt
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from utils.http_cache import conditional_response
+
+# 需要随缓存一起保存并在命中时回放的响应头
+_REPLAY_HEADERS = ("x-next-cursor",)
+
+@dataclass
+class CachedResponse:
+    """缓存的序列化响应：JSON字节串及其校验信息"""
+    body: bytes
+    etag: str
+    last_modified: Optional[dt]
+    headers: Dict[str, str]
+    tags: Tuple[str, ...]
+    expires_at: float = field(default=0.0)
+
+    def respond(self, request: Request) -> Response:
+        """生成命中缓存时的响应，同样支持条件请求304"""
+        response = Response(content=self.body, media_type="application/json", headers=self.headers)
+        response.headers["X-Cache"] = "HIT"
+        return conditional_response(request, response, self.etag, self.last_modified) or response
+
+@lru_cache(maxsize=None)
+def _adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+class ResponseCache:
+    """
+    进程内的读穿透响应缓存
+    以 路由路径+规范化查询参数 为键保存序列化后的JSON字节串，按总字节数做LRU淘汰并带TTL；
+    写操作按标签失效（如 camera:42、camera:list，或用 camera:* 失效该实体的全部条目）。
+    每个worker进程各自一份，失效只作用于本进程，其他进程最多在TTL后更新。
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+        self._data: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        """缓存键：路径 + 排序后的查询参数，参数顺序不同的相同请求共享同一条目"""
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        key: str,
+        response: Response,
+        model: Any,
+        value: Any,
+        tags: Iterable[str],
+        etag: str,
+        last_modified: Optional[dt],
+    ) -> Response:
+        """按响应模型序列化结果并写入缓存，返回可直接返回给客户端的响应"""
+        adapter = _adapter(model)
+        body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+        headers = {k: v for k, v in response.headers.items() if k.lower() in _REPLAY_HEADERS}
+        headers["ETag"] = etag
+        if "last-modified" in response.headers:
+            headers["Last-Modified"] = response.headers["last-modified"]
+        entry = CachedResponse(
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+            headers=headers,
+            tags=tuple(tags),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        if len(body) <= self.max_bytes:
+            with self._lock:
+                self._remove(key)
+                self._data[key] = entry
+                self.size_bytes += len(body)
+                while self.size_bytes > self.max_bytes:
+                    self._remove(next(iter(self._data)))
+        result = Response(content=body, media_type="application/json", headers=headers)
+        result.headers["X-Cache"] = "MISS"
+        return result
+
+    def invalidate(self, *tags: str) -> int:
+        """按标签失效缓存条目；以 :* 结尾的标签按前缀匹配，返回失效条目数"""
+        exact = {t for t in tags if not t.endswith(":*")}
+        prefixes = tuple(t[:-1] for t in tags if t.endswith(":*"))
+        with self._lock:
+            keys = [
+                key for key, entry in self._data.items()
+                if any(t in exact or (prefixes and t.startswith(prefixes)) for t in entry.tags)
+            ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry.body)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+# 目录类接口（品牌、卡口、相机、镜头）共用的响应缓存
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")),
+)